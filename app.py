@@ -6,12 +6,18 @@ import asyncio
 from utils.parking_handler import ParkingTicketHandler
 from utils.housing_handler import HousingHandler
 from utils.document_generator import DocumentGenerator
+from utils.document_pages import is_supported_upload
+from utils.output_janitor import get_output_janitor
 
 # Initialize handlers
 parking_handler = ParkingTicketHandler()
 housing_handler = HousingHandler()
 doc_generator = DocumentGenerator()
 
+# Keep saved documents from piling up on disk
+if doc_generator.save_to_disk:
+    get_output_janitor().start()
+
 @cl.on_chat_start
 async def start():
     """Initialize the chat session."""
@@ -79,9 +85,10 @@ async def main(message: cl.Message):
     
     # Extract files from message if any
     files = message.elements if hasattr(message, 'elements') and message.elements else None
-    image_files = []
+    document_files = []
     if files:
-        image_files = [f for f in files if hasattr(f, 'mime') and f.mime and f.mime.startswith('image/')]
+        # Images and PDFs; other attachments are ignored
+        document_files = [f for f in files if is_supported_upload(getattr(f, 'mime', None))]
     
     if current_step == "selection":
         # Handle dispute type selection
@@ -102,9 +109,9 @@ async def main(message: cl.Message):
     elif current_step == "collecting":
         # Route to appropriate handler with file support
         if dispute_type == "parking":
-            await parking_handler.handle_message(message.content, image_files)
+            await parking_handler.handle_message(message.content, document_files)
         elif dispute_type == "housing":
-            await housing_handler.handle_message(message.content, image_files)
+            await housing_handler.handle_message(message.content, document_files)
     
     elif current_step == "review":
         # Handle document review and generation
@@ -154,21 +161,19 @@ async def generate_document():
     await generating_msg.send()
     
     try:
-        # Generate document
-        if dispute_type == "parking":
-            file_path = await doc_generator.generate_parking_dispute(collected_data)
-            doc_type = "Parking Ticket Dispute"
-        elif dispute_type == "housing":
-            file_path = await doc_generator.generate_housing_dispute(collected_data)
-            doc_type = "Housing Dispute"
+        # Generate the Word and PDF versions in parallel
+        documents = await doc_generator.generate_documents(dispute_type, collected_data, ("docx", "pdf"))
+        doc_type = "Parking Ticket Dispute" if dispute_type == "parking" else "Housing Dispute"
         
-        # Send the document
+        # Send the documents straight from memory
         elements = [
             cl.File(
-                name=f"{doc_type.replace(' ', '_').lower()}.docx",
-                path=file_path,
+                name=f"{doc_type.replace(' ', '_').lower()}.{file_format}",
+                content=document["content"],
+                mime=document["mime"],
                 display="inline"
             )
+            for file_format, document in documents.items()
         ]
         
         await cl.Message(
@@ -181,7 +186,7 @@ async def generate_document():
 - Your specific case details
 - Proper legal language
 
-You can download the document using the file attachment above.
+You can download the document as Word or PDF using the file attachments above.
 
 Would you like to create another dispute document? Type **'restart'** to begin again or **'quit'** to end the session.
             """,
@@ -0,0 +1,185 @@
+"""Generate dispute documents in bulk from a CSV or JSONL file of cases.
+
+Each row is one case with the same fields the chat collects (ticket_number,
+personal_info, dispute_reason, ...). Documents are written to the output directory as
+<case id>-<hash>.<format>, and every finished case is appended to manifest.jsonl there, so
+an interrupted run picks up where it stopped when started again.
+
+    python batch_generate.py cases.csv --type parking --output-dir disputes --formats docx pdf
+"""
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+import asyncio
+import argparse
+from typing import Any, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+from utils.document_generator import FORMATS, DocumentGenerator
+
+DOCUMENT_TYPES = ("parking", "housing")
+
+# (case id, dispute type, case data) for one row of the input
+Case = Tuple[str, str, Dict[str, Any]]
+
+
+def read_cases(path: str, default_type: Optional[str]) -> Iterator[Case]:
+    """Yield the cases of a CSV or JSONL file one at a time.
+
+    A case's id comes from its case_id or id field, or its row number; its dispute type
+    from its dispute_type field, or the default. Empty fields are dropped so the
+    templates fill in their defaults.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+
+        for row_number, row in enumerate(rows, start=1):
+            data = {key: value for key, value in row.items() if key and value not in (None, "")}
+            case_id = data.pop("case_id", data.pop("id", row_number))
+            yield str(case_id), data.pop("dispute_type", None) or default_type, data
+
+
+def load_finished(manifest_path: str) -> Dict[str, Set[str]]:
+    """Formats already generated successfully for each case by an earlier run."""
+    finished: Dict[str, Set[str]] = {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short when the previous run was killed
+                    continue
+                if entry.get("status") == "ok":
+                    # Entries written before formats were recorded still list their files
+                    formats = entry.get("formats") or entry.get("files", {}).keys()
+                    finished.setdefault(entry["case_id"], set()).update(formats)
+    except FileNotFoundError:
+        pass
+    return finished
+
+
+def safe_filename(case_id: str) -> str:
+    """A file name for a case id, unique even when ids differ only in replaced characters."""
+    name = "".join(c if c.isalnum() or c in "-_." else "_" for c in case_id).strip(".")[:100] or "case"
+    # "c/3" and "c_3" clean up to the same name; the hash of the raw id keeps them apart
+    digest = hashlib.sha256(case_id.encode("utf-8")).hexdigest()[:8]
+    return f"{name}-{digest}"
+
+
+def write_file(path: str, content: bytes):
+    """Write a document so an interrupted run never leaves a partial file behind."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+async def generate_case(generator: DocumentGenerator, case: Case, output_dir: str,
+                        file_formats: Sequence[str]) -> Dict[str, Any]:
+    """Generate and save one case's documents and return its manifest entry."""
+    case_id, document_type, data = case
+    entry: Dict[str, Any] = {"case_id": case_id, "dispute_type": document_type, "formats": list(file_formats)}
+    try:
+        if document_type not in DOCUMENT_TYPES:
+            raise ValueError(f"unknown or missing dispute type {document_type!r}")
+        documents = await generator.generate_documents(document_type, data, file_formats)
+        files = {}
+        for file_format, document in documents.items():
+            path = os.path.join(output_dir, f"{safe_filename(case_id)}.{file_format}")
+            await asyncio.to_thread(write_file, path, document["content"])
+            files[file_format] = path
+        entry.update(status="ok", files=files)
+    except Exception as e:
+        # One bad case should not stop the batch; it is retried on the next run
+        entry.update(status="error", error=str(e))
+    return entry
+
+
+async def run_batch(cases: Iterator[Case], generator: DocumentGenerator, output_dir: str,
+                    file_formats: Sequence[str], finished: Dict[str, Set[str]],
+                    manifest_path: str) -> Dict[str, int]:
+    """Generate every unfinished case, appending each result to the manifest as it completes.
+
+    A case counts as finished only when an earlier run produced every requested format.
+    """
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    in_flight: Set[asyncio.Task] = set()
+    # Enough cases in flight to keep every worker busy without reading the whole file up front
+    max_in_flight = generator.max_concurrent * 2
+    start = time.perf_counter()
+
+    with open(manifest_path, "a", encoding="utf-8") as manifest:
+        def record(entry: Dict[str, Any]):
+            manifest.write(json.dumps(entry) + "\n")
+            # Flush per case so a killed run loses at most the cases still in flight
+            manifest.flush()
+            counts[entry["status"]] += 1
+            if entry["status"] == "error":
+                print(f"Case {entry['case_id']} failed: {entry['error']}")
+            done = counts["ok"] + counts["error"]
+            if done % 100 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{done} cases, {counts['ok'] * len(file_formats) / elapsed:.1f} docs/s")
+
+        for case in cases:
+            if set(file_formats) <= finished.get(case[0], set()):
+                counts["skipped"] += 1
+                continue
+            in_flight.add(asyncio.create_task(generate_case(generator, case, output_dir, file_formats)))
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    record(task.result())
+
+        while in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                record(task.result())
+
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate dispute documents in bulk from a CSV or JSONL file.")
+    parser.add_argument("input", help="CSV or JSONL file with one case per row")
+    parser.add_argument("--type", choices=DOCUMENT_TYPES,
+                        help="dispute type for rows without a dispute_type field")
+    parser.add_argument("--output-dir", default="batch_output", help="where documents and the manifest go")
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMATS), default=["docx"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="document worker processes (default: %(default)s)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="regenerate cases already listed as done in the manifest")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, "manifest.jsonl")
+    finished = {} if args.no_resume else load_finished(manifest_path)
+    if finished:
+        print(f"Resuming: {len(finished)} cases already generated")
+
+    generator = DocumentGenerator(max_workers=args.workers, save_to_disk=False)
+    start = time.perf_counter()
+    try:
+        counts = asyncio.run(run_batch(read_cases(args.input, args.type), generator, args.output_dir,
+                                       args.formats, finished, manifest_path))
+    finally:
+        generator.shutdown()
+    elapsed = time.perf_counter() - start
+
+    documents = counts["ok"] * len(args.formats)
+    print(f"Generated {documents} documents for {counts['ok']} cases in {elapsed:.1f}s "
+          f"({documents / elapsed if elapsed else 0.0:.1f} docs/s); "
+          f"{counts['error']} failed, {counts['skipped']} skipped as already done")
+    print(f"Manifest: {manifest_path}")
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Stage-by-stage OCR benchmark on synthetic parking tickets and housing notices.
+
+Run from the repository root:
+
+    python -m benchmarks.ocr_benchmark --count 35 --workers 4 --json results.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+import pytesseract
+
+from utils.field_extractor import HOUSING_DOCUMENT_SPEC, PARKING_TICKET_SPEC
+from utils.image_processor import TESSERACT_CONFIG, ImageProcessor
+from utils.tesseract_engine import data_to_text
+from benchmarks.synthetic_documents import CONDITIONS, generate_documents
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+SPECS = {"parking": PARKING_TICKET_SPEC, "housing": HOUSING_DOCUMENT_SPEC}
+
+# Stages of the preprocessed OCR pass -> the timing stage recorded for them.
+# Totals per stage, so a resize done while straightening a page also counts as resize.
+STAGES = {
+    "decode": "ocr.decode",
+    "quality": "ocr.quality",
+    "orientation": "ocr.orientation",
+    "resize": "ocr.resize",
+    "denoise": "ocr.denoise",
+    "clahe": "ocr.clahe",
+    "threshold": "ocr.threshold",
+    "tesseract": "tesseract.image_to_data",
+    "regex": "fields.extract",
+}
+
+
+def time_stages(processor: ImageProcessor, document_type: str, content: bytes) -> Dict[str, float]:
+    """Run the preprocessed pass stage by stage and return each stage's time in ms."""
+    with processor.timings.capture() as timings:
+        gray = processor.load_grayscale(content)
+        processor.assess_image_quality(gray)
+        gray, _ = processor.correct_orientation(gray)
+        gray, _ = processor.normalize_resolution(gray)
+        denoised, _, _ = processor.denoise(gray)
+        binary = processor.binarize(processor.enhance_contrast(denoised))
+        text = data_to_text(processor.engine.image_to_data(binary, config=TESSERACT_CONFIG))
+        SPECS[document_type].extract(text)
+    return {stage: timings.get(name, 0.0) for stage, name in STAGES.items()}
+
+
+def normalize_value(value: str) -> str:
+    return " ".join(value.upper().split())
+
+
+def run_document(processor: ImageProcessor, document: Dict[str, Any], stages: bool) -> Dict[str, Any]:
+    """Benchmark one document: optional stage timings, then the full OCR cascade."""
+    document_type = document["document_type"]
+    record: Dict[str, Any] = {
+        "document_type": document_type,
+        "condition": document["condition"],
+        "size": list(document["size"]),
+    }
+    if stages:
+        record["stages"] = time_stages(processor, document_type, document["content"])
+
+    ocr = processor.ocr_parking_ticket if document_type == "parking" else processor.ocr_housing_document
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = ocr(document["content"])
+    record["latency_ms"] = (time.perf_counter() - start) * 1000
+    record["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+    record["passes"] = [attempt["pass"] for attempt in result.get("cascade", [])]
+    record["orientation"] = result.get("orientation", {})
+    record["fields"] = {
+        field: normalize_value(result["fields"].get(field, "")) == normalize_value(expected)
+        for field, expected in document["fields"].items()
+    }
+    return record
+
+
+def measure_parallel_throughput(documents: Sequence[Dict[str, Any]], workers: int) -> float:
+    """Documents per second through ImageProcessor.ocr_batch with a worker pool."""
+    processor = ImageProcessor()
+    start = time.perf_counter()
+    for document_type in SPECS:
+        contents = [document["content"] for document in documents if document["document_type"] == document_type]
+        for _ in processor.ocr_batch(document_type, contents, max_workers=workers):
+            pass
+    return len(documents) / (time.perf_counter() - start)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def print_report(records: List[Dict[str, Any]], parallel_throughput: Dict[int, float]):
+    """Print latency, accuracy, throughput and memory tables."""
+    staged = [record for record in records if "stages" in record]
+    if staged:
+        print("\nStage latency, preprocessed pass (ms)")
+        print(f"  {'stage':<12}{'mean':>9}{'p50':>9}{'p95':>9}")
+        for stage in STAGES:
+            values = [record["stages"][stage] for record in staged]
+            print(f"  {stage:<12}{sum(values) / len(values):>9.1f}{percentile(values, 0.5):>9.1f}"
+                  f"{percentile(values, 0.95):>9.1f}")
+
+    print("\nFull OCR cascade by condition")
+    print(f"  {'condition':<20}{'docs':>6}{'mean ms':>10}{'p95 ms':>10}{'fields ok':>11}")
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(f"{record['document_type']}/{record['condition']}", []).append(record)
+    for name, group in sorted(groups.items()):
+        latencies = [record["latency_ms"] for record in group]
+        checks = [ok for record in group for ok in record["fields"].values()]
+        print(f"  {name:<20}{len(group):>6}{sum(latencies) / len(latencies):>10.1f}"
+              f"{percentile(latencies, 0.95):>10.1f}{100 * sum(checks) / len(checks):>10.1f}%")
+
+    print("\nField accuracy")
+    field_checks: Dict[str, List[bool]] = {}
+    for record in records:
+        for field, ok in record["fields"].items():
+            field_checks.setdefault(f"{record['document_type']}.{field}", []).append(ok)
+    for field, checks in sorted(field_checks.items()):
+        print(f"  {field:<36}{100 * sum(checks) / len(checks):>6.1f}%")
+
+    total_seconds = sum(record["latency_ms"] for record in records) / 1000
+    print("\nThroughput")
+    print(f"  sequential: {len(records) / total_seconds:.2f} docs/s")
+    for workers, throughput in parallel_throughput.items():
+        print(f"  {workers} workers: {throughput:.2f} docs/s")
+
+    print("\nMemory")
+    print(f"  peak traced per document: {max(record['peak_memory_mb'] for record in records):.1f} MB")
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reported in bytes on macOS and kilobytes elsewhere
+        max_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+        print(f"  process max RSS: {max_rss_mb:.1f} MB")
+
+
+def tesseract_available(processor: ImageProcessor) -> bool:
+    if processor.engine.persistent:
+        return True
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except pytesseract.TesseractNotFoundError:
+        return False
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark OCR latency and accuracy on synthetic documents.")
+    parser.add_argument("--count", type=int, default=len(CONDITIONS) * 3,
+                        help="documents per document type (default: %(default)s)")
+    parser.add_argument("--document", choices=("parking", "housing", "all"), default="all")
+    parser.add_argument("--conditions", nargs="+", choices=sorted(CONDITIONS),
+                        help="degradations to cover (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="*", default=[],
+                        help="also measure batch throughput with these worker counts")
+    parser.add_argument("--no-stages", action="store_true", help="skip the per-stage breakdown")
+    parser.add_argument("--json", help="write per-document results to this file")
+    args = parser.parse_args(argv)
+
+    processor = ImageProcessor()
+    # Stage timings come from the pipeline's own instrumentation
+    processor.timings.enabled = True
+    if not tesseract_available(processor):
+        print("Tesseract is not installed; see the README setup instructions.")
+        return 1
+
+    document_types = list(SPECS) if args.document == "all" else [args.document]
+    documents = [document for document_type in document_types
+                 for document in generate_documents(document_type, args.count, args.conditions, args.seed)]
+    print(f"Benchmarking {len(documents)} synthetic documents on {os.cpu_count()} CPUs")
+
+    # Warm up the engine so the first document is not charged for loading it
+    processor.engine.warm_up()
+    run_document(processor, documents[0], stages=False)
+
+    tracemalloc.start()
+    try:
+        records = [run_document(processor, document, not args.no_stages) for document in documents]
+    finally:
+        tracemalloc.stop()
+
+    parallel_throughput = {workers: measure_parallel_throughput(documents, workers) for workers in args.workers}
+    print_report(records, parallel_throughput)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"records": records, "parallel_throughput": parallel_throughput}, f, indent=2)
+        print(f"\nWrote results to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import io
+import random
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+# Letter-size page at 150 DPI
+PAGE_SIZE = (1275, 1650)
+PAPER_COLOR = 245
+INK_COLOR = 25
+
+FONT_CANDIDATES = ("DejaVuSans.ttf", "arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf")
+BOLD_FONT_CANDIDATES = ("DejaVuSans-Bold.ttf", "arialbd.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf")
+
+# Degradations applied to a rendered page, by condition name:
+# noise (gray-level standard deviation), blur (Gaussian radius), rotation (degrees, random
+# sign), scale (resize factor) and shading (uneven lighting across the page)
+CONDITIONS: Dict[str, Dict[str, Any]] = {
+    "clean": {},
+    "noisy": {"noise": 18.0},
+    "blurred": {"blur": 1.6},
+    "rotated": {"rotation": 7.0},
+    "sideways": {"rotation": 90.0},
+    "low_res": {"scale": 0.45},
+    "phone": {"noise": 8.0, "blur": 0.8, "rotation": 3.0, "scale": 1.6, "shading": True},
+}
+
+STREET_NAMES = ("Maple", "Oak", "Cedar", "Elm", "Washington", "Lincoln", "Park", "Lake", "Hill", "Sunset")
+STREET_SUFFIXES = ("ST", "AVE", "BLVD", "RD", "DR")
+VIOLATIONS = ("EXPIRED METER", "NO PARKING ZONE", "FIRE HYDRANT", "LOADING ZONE", "BLOCKED DRIVEWAY")
+LANDLORDS = ("Greenview Properties", "Oakridge Realty", "Summit Housing Group", "Harbor Rentals")
+
+# Housing issue type -> (heading, body line) worded so only that issue's keywords appear
+HOUSING_ISSUES = {
+    "LEASE": ("LEASE RENEWAL", "TENANCY ENDS ON THE DATE BELOW"),
+    "MAINTENANCE": ("MAINTENANCE REQUEST", "REPAIR NEEDED: KITCHEN LEAK"),
+    "EVICTION": ("EVICTION NOTICE", "NOTICE TO QUIT THE PREMISES"),
+    "DEPOSIT": ("DEPOSIT DISPUTE", "SECURITY DEPOSIT REFUND REQUESTED"),
+    "NOTICE": ("NOTICE TO TENANT", "WARNING: NOISE COMPLAINT"),
+}
+
+
+def load_font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """Load a TrueType font, falling back to PIL's built-in one."""
+    for name in BOLD_FONT_CANDIDATES if bold else FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only has the small bitmap font
+        return ImageFont.load_default()
+
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(2021, 2025)}"
+
+
+def _address(rng: random.Random) -> str:
+    return f"{rng.randint(10, 9999)} {rng.choice(STREET_NAMES)} {rng.choice(STREET_SUFFIXES)}"
+
+
+def parking_ticket_content(rng: random.Random) -> Dict[str, Any]:
+    """Random parking ticket lines and the fields the extractor should read from them."""
+    letters = "ABCDEFGHJKLMNPRSTUVWXYZ"
+    ticket = "".join(rng.choice(letters) for _ in range(2)) + "".join(rng.choice("0123456789") for _ in range(7))
+    plate = (rng.choice("123456789") + "".join(rng.choice(letters) for _ in range(3)) +
+             "".join(rng.choice("0123456789") for _ in range(3)))
+    date = _date(rng)
+    location = _address(rng)
+    violation = rng.choice(VIOLATIONS)
+    amount = f"{rng.choice((35, 45, 60, 75, 95, 120))}.00"
+
+    lines = [
+        "CITY OF SPRINGFIELD",
+        "PARKING VIOLATION NOTICE",
+        f"CITATION NO: {ticket}",
+        f"DATE: {date}",
+        f"LOCATION: {location}",
+        f"VIOLATION: {violation}",
+        f"PLATE: {plate}",
+        f"FINE: ${amount}",
+    ]
+    fields = {
+        "ticket_number": ticket,
+        "issue_date": date,
+        "violation_description": f"VIOLATION: {violation}",
+        "location": location,
+        "vehicle_info": f"License Plate: {plate}",
+        "amount": f"${amount}",
+    }
+    return {"lines": lines, "headings": 2, "fields": fields}
+
+
+def housing_notice_content(rng: random.Random) -> Dict[str, Any]:
+    """Random housing notice lines and the fields the extractor should read from them."""
+    issue_type = rng.choice(sorted(HOUSING_ISSUES))
+    heading, body = HOUSING_ISSUES[issue_type]
+    address = _address(rng)
+    landlord = rng.choice(LANDLORDS)
+    rent = str(rng.randint(8, 35) * 50)
+    first_date, second_date = _date(rng), _date(rng)
+
+    lines = [
+        heading,
+        f"DATE: {first_date}",
+        f"PROPERTY: {address}",
+        f"LANDLORD: {landlord}",
+        body,
+        f"RENT: ${rent}",
+        f"RESPOND BY: {second_date}",
+    ]
+    fields = {
+        "property_address": address,
+        "landlord_info": landlord,
+        "issue_type": issue_type,
+        "dates": f"{first_date}, {second_date}",
+        "rent_amount": f"${rent}",
+    }
+    return {"lines": lines, "headings": 1, "fields": fields}
+
+
+def render_page(lines: Sequence[str], headings: int = 1) -> Image.Image:
+    """Draw text lines onto a blank grayscale page; the first lines are set as headings."""
+    page = Image.new("L", PAGE_SIZE, PAPER_COLOR)
+    draw = ImageDraw.Draw(page)
+    heading_font = load_font(46, bold=True)
+    body_font = load_font(34)
+
+    top = 120
+    for i, line in enumerate(lines):
+        font = heading_font if i < headings else body_font
+        draw.text((110, top), line, fill=INK_COLOR, font=font)
+        top += 110 if i < headings else 90
+    return page
+
+
+def degrade(page: Image.Image, condition: Dict[str, Any], rng: random.Random) -> Image.Image:
+    """Apply a condition's lighting, resolution, rotation, blur and noise to a page."""
+    if condition.get("shading"):
+        # Light falls off towards one side of the page, as under a desk lamp
+        width, height = page.size
+        gradient = np.linspace(1.0, 0.7, width, dtype=np.float32)[None, :]
+        page = Image.fromarray((np.asarray(page, dtype=np.float32) * gradient).astype(np.uint8))
+
+    scale = condition.get("scale")
+    if scale:
+        width, height = page.size
+        page = page.resize((int(width * scale), int(height * scale)), Image.Resampling.LANCZOS)
+
+    rotation = condition.get("rotation")
+    if rotation:
+        page = page.rotate(rotation * rng.choice((-1, 1)), resample=Image.Resampling.BICUBIC,
+                           expand=True, fillcolor=PAPER_COLOR)
+
+    blur = condition.get("blur")
+    if blur:
+        page = page.filter(ImageFilter.GaussianBlur(blur))
+
+    noise = condition.get("noise")
+    if noise:
+        pixels = np.asarray(page, dtype=np.float32)
+        noisy = pixels + np.random.default_rng(rng.randrange(2 ** 32)).normal(0, noise, pixels.shape)
+        page = Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8))
+
+    return page
+
+
+def generate_documents(document_type: str, count: int, conditions: Optional[Sequence[str]] = None,
+                       seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield synthetic documents as JPEG upload bytes with their ground-truth fields.
+
+    Conditions are cycled so every one is covered evenly.
+    """
+    if document_type == "parking":
+        make_content = parking_ticket_content
+    elif document_type == "housing":
+        make_content = housing_notice_content
+    else:
+        raise ValueError(f"Unknown document type: {document_type}")
+
+    condition_names = list(conditions or CONDITIONS)
+    rng = random.Random(f"{document_type}:{seed}")
+    for i in range(count):
+        condition_name = condition_names[i % len(condition_names)]
+        content = make_content(rng)
+        page = degrade(render_page(content["lines"], content["headings"]), CONDITIONS[condition_name], rng)
+
+        buffer = io.BytesIO()
+        page.save(buffer, "JPEG", quality=90)
+        yield {
+            "document_type": document_type,
+            "condition": condition_name,
+            "content": buffer.getvalue(),
+            "size": page.size,
+            "fields": content["fields"],
+        }
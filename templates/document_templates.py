@@ -1,5 +1,42 @@
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
+
+# Bump when a template or the generated document layout changes so cached documents are rebuilt
+TEMPLATE_VERSION = "2"
+
+# Section kinds: the centered line under the title, a block set in bold, and a plain paragraph
+SUBTITLE = "subtitle"
+HEADER = "header"
+PARAGRAPH = "paragraph"
+
+# Labels that open a bold block of a dispute letter
+HEADERS = frozenset({
+    "RE:",
+    "VEHICLE INFORMATION:",
+    "VIOLATION ALLEGED:",
+    "GROUNDS FOR DISPUTE:",
+    "SUPPORTING EVIDENCE:",
+    "LEGAL BASIS FOR DISMISSAL:",
+    "CONCLUSION:",
+    "PROPERTY INFORMATION:",
+    "ISSUE DESCRIPTION:",
+    "TIMELINE OF EVENTS:",
+    "PREVIOUS ATTEMPTS AT RESOLUTION:",
+    "IMPACT ON HABITABILITY:",
+    "REQUESTED RESOLUTION:",
+    "LEGAL OBLIGATIONS:",
+    "SUPPORTING DOCUMENTATION:",
+    "TIMELINE FOR RESPONSE:",
+    "NEXT STEPS:",
+    "COPIES SENT TO:",
+    "ATTACHMENTS:",
+})
+
+
+class Section(NamedTuple):
+    """One block of a generated document."""
+    kind: str
+    text: str
 
 # Document templates for parking ticket disputes
 PARKING_DISPUTE_TEMPLATE = """
@@ -147,8 +184,39 @@ ATTACHMENTS:
 - Copy of lease agreement (relevant sections)
 """
 
-def format_parking_dispute(data: Dict[str, Any]) -> str:
-    """Format parking dispute document with provided data."""
+def _section_kind(block: str) -> str:
+    """A template block is a header when its first line opens with a known label."""
+    label, colon, _ = block.split("\n", 1)[0].partition(":")
+    return HEADER if colon and f"{label}:" in HEADERS else PARAGRAPH
+
+def _compile_template(template: str) -> List[Tuple[str, str]]:
+    """Split a template into (kind, block) pairs once, at import."""
+    return [(_section_kind(block.strip()), block.strip()) for block in template.split("\n\n") if block.strip()]
+
+PARKING_DISPUTE_SECTIONS = _compile_template(PARKING_DISPUTE_TEMPLATE)
+HOUSING_DISPUTE_SECTIONS = _compile_template(HOUSING_DISPUTE_TEMPLATE)
+
+def _fill_sections(subtitle: str, template_sections: List[Tuple[str, str]], values: Dict[str, Any]) -> List[Section]:
+    return [Section(SUBTITLE, subtitle)] + [
+        Section(kind, block.format(**values)) for kind, block in template_sections
+    ]
+
+def section_paragraphs(sections: List[Section]) -> Iterator[Tuple[str, str]]:
+    """Yield (kind, text) for each paragraph a renderer should draw.
+    
+    A value with blank lines in it continues as plain paragraphs after its section's first one.
+    """
+    for section in sections:
+        paragraphs = [text.strip() for text in section.text.split("\n\n") if text.strip()]
+        for i, text in enumerate(paragraphs):
+            yield (section.kind if i == 0 else PARAGRAPH), text
+
+def sections_to_text(sections: List[Section]) -> str:
+    """Plain-text version of a document, one blank line between sections."""
+    return "\n\n".join(section.text for section in sections if section.kind != SUBTITLE)
+
+def parking_dispute_sections(data: Dict[str, Any]) -> List[Section]:
+    """Build the sections of a parking dispute document from the provided data."""
     current_date = datetime.now().strftime("%B %d, %Y")
     
     # Parse personal info
@@ -172,23 +240,24 @@ def format_parking_dispute(data: Dict[str, Any]) -> str:
         elif line.lower().startswith("email"):
             email = line.split(":", 1)[1].strip()
     
-    return PARKING_DISPUTE_TEMPLATE.format(
+    ticket_number = data.get("ticket_number", "N/A")
+    return _fill_sections(f"Citation Number: {ticket_number}", PARKING_DISPUTE_SECTIONS, dict(
         date=current_date,
         name=name,
         address=address,
         phone=phone,
         email=email,
-        ticket_number=data.get("ticket_number", "N/A"),
+        ticket_number=ticket_number,
         issue_date=data.get("issue_date", "N/A"),
         location=data.get("location", "N/A"),
         vehicle_info=data.get("vehicle_info", "N/A"),
         violation_description=data.get("violation_description", "N/A"),
         dispute_reason=data.get("dispute_reason", "N/A"),
         evidence=data.get("evidence", "No additional evidence provided")
-    )
+    ))
 
-def format_housing_dispute(data: Dict[str, Any]) -> str:
-    """Format housing dispute document with provided data."""
+def housing_dispute_sections(data: Dict[str, Any]) -> List[Section]:
+    """Build the sections of a housing dispute document from the provided data."""
     current_date = datetime.now().strftime("%B %d, %Y")
     
     # Parse property info
@@ -242,7 +311,7 @@ def format_housing_dispute(data: Dict[str, Any]) -> str:
         elif line.lower().startswith("email"):
             tenant_email = line.split(":", 1)[1].strip()
     
-    return HOUSING_DISPUTE_TEMPLATE.format(
+    return _fill_sections(f"Property: {property_address}", HOUSING_DISPUTE_SECTIONS, dict(
         date=current_date,
         landlord_name=landlord_name,
         landlord_address=landlord_address,
@@ -258,4 +327,12 @@ def format_housing_dispute(data: Dict[str, Any]) -> str:
         attempted_resolution=data.get("attempted_resolution", "N/A"),
         desired_outcome=data.get("desired_outcome", "N/A"),
         evidence=data.get("evidence", "No additional evidence provided")
-    )
\ No newline at end of file
+    ))
+
+def format_parking_dispute(data: Dict[str, Any]) -> str:
+    """Format parking dispute document with provided data."""
+    return sections_to_text(parking_dispute_sections(data))
+
+def format_housing_dispute(data: Dict[str, Any]) -> str:
+    """Format housing dispute document with provided data."""
+    return sections_to_text(housing_dispute_sections(data))
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from batch_generate import load_finished, main, read_cases, safe_filename
+
+
+def write_cases(path, cases):
+    path.write_text("".join(json.dumps(case) + "\n" for case in cases), encoding="utf-8")
+
+
+def read_manifest(output_dir):
+    with open(output_dir / "manifest.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_safe_filename_keeps_distinct_ids_apart():
+    assert safe_filename("c/3") != safe_filename("c_3")
+    assert safe_filename("c/3") == safe_filename("c/3")
+    assert safe_filename("../../etc").startswith("_.._etc-")
+    assert safe_filename("...").startswith("case-")
+
+
+def test_read_cases_ids_and_types(tmp_path):
+    cases = tmp_path / "cases.jsonl"
+    write_cases(cases, [{"id": 0, "ticket_number": "1"}, {"dispute_type": "housing", "issue_type": ""}])
+    assert list(read_cases(str(cases), "parking")) == [
+        ("0", "parking", {"ticket_number": "1"}),
+        ("2", "housing", {}),
+    ]
+
+
+def test_load_finished_tolerates_old_and_truncated_entries(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        json.dumps({"case_id": "a", "status": "ok", "files": {"docx": "a.docx"}}) + "\n"
+        + json.dumps({"case_id": "b", "status": "ok", "formats": ["pdf"], "files": {}}) + "\n"
+        + json.dumps({"case_id": "c", "status": "error", "formats": ["docx"]}) + "\n"
+        + '{"case_id": "d", "sta',
+        encoding="utf-8"
+    )
+    assert load_finished(str(manifest)) == {"a": {"docx"}, "b": {"pdf"}}
+
+
+@pytest.fixture
+def batch(tmp_path):
+    cases = tmp_path / "cases.jsonl"
+    write_cases(cases, [
+        {"case_id": "c/3", "ticket_number": "1"},
+        {"case_id": "c_3", "ticket_number": "2"},
+        {"case_id": "bad", "dispute_type": "boat"},
+    ])
+    output_dir = tmp_path / "out"
+
+    def run(*formats):
+        return main([str(cases), "--type", "parking", "--output-dir", str(output_dir),
+                     "--workers", "1", "--formats", *formats])
+    return run, output_dir
+
+
+def test_batch_writes_every_case_once(batch):
+    run, output_dir = batch
+    # The unknown dispute type fails without stopping the batch
+    assert run("docx") == 1
+    entries = read_manifest(output_dir)
+    assert {entry["case_id"]: entry["status"] for entry in entries} == {"c/3": "ok", "c_3": "ok", "bad": "error"}
+    assert len({entry["files"]["docx"] for entry in entries if entry["status"] == "ok"}) == 2
+
+
+def test_resume_skips_done_cases_until_formats_change(batch):
+    run, output_dir = batch
+    run("docx")
+    run("docx")
+    # Only the failed case was retried
+    assert [entry["case_id"] for entry in read_manifest(output_dir)[3:]] == ["bad"]
+
+    run("docx", "pdf")
+    regenerated = [entry for entry in read_manifest(output_dir)[4:] if entry["status"] == "ok"]
+    assert sorted(entry["case_id"] for entry in regenerated) == ["c/3", "c_3"]
+    assert all(entry["formats"] == ["docx", "pdf"] for entry in regenerated)
+    assert all(set(entry["files"]) == {"docx", "pdf"} for entry in regenerated)
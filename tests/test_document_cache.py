@@ -0,0 +1,70 @@
+import asyncio
+
+from utils.document_cache import DocumentCache
+from utils.document_generator import DocumentGenerator
+
+CASE = {"ticket_number": "PK4829173", "dispute_reason": "The meter was broken"}
+
+
+def document(size: int, path=None):
+    return {"id": "doc", "content": b"x" * size, "path": path}
+
+
+def test_key_ignores_field_order():
+    reordered = dict(reversed(list(CASE.items())))
+    assert DocumentCache.make_key("parking", CASE) == DocumentCache.make_key("parking", reordered)
+
+
+def test_key_depends_on_case_type_and_format():
+    key = DocumentCache.make_key("parking", CASE)
+    assert key != DocumentCache.make_key("housing", CASE)
+    assert key != DocumentCache.make_key("parking", CASE, "pdf")
+    assert key != DocumentCache.make_key("parking", dict(CASE, dispute_reason="Signs were missing"))
+
+
+def test_least_recently_used_is_evicted_by_count():
+    cache = DocumentCache(max_entries=2, max_bytes=1024)
+    cache.put("a", document(10))
+    cache.put("b", document(10))
+    cache.get("a")
+    cache.put("c", document(10))
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_eviction_by_total_size():
+    cache = DocumentCache(max_entries=10, max_bytes=100)
+    cache.put("a", document(60))
+    cache.put("b", document(60))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    # Documents larger than the whole cache are never stored
+    cache.put("huge", document(101))
+    assert cache.get("huge") is None
+
+
+def test_get_returns_a_copy():
+    cache = DocumentCache(max_entries=2, max_bytes=1024)
+    cache.put("a", document(10))
+    cache.get("a")["id"] = "changed"
+    assert cache.get("a")["id"] == "doc"
+
+
+def test_unchanged_case_is_not_rebuilt():
+    generator = DocumentGenerator(max_workers=1, save_to_disk=False, cache=DocumentCache(max_entries=4))
+
+    async def generate_twice():
+        first = await generator.generate_parking_dispute(dict(CASE))
+        # Any pool work on the second call would fail
+        generator._get_executor = None
+        second = await generator.generate_parking_dispute(dict(CASE))
+        return first, second
+
+    try:
+        first, second = asyncio.run(generate_twice())
+    finally:
+        del generator._get_executor
+        generator.shutdown()
+    assert second["content"] == first["content"]
+    assert second["content"].startswith(b"PK")
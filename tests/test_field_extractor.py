@@ -0,0 +1,51 @@
+import pytest
+
+from utils.field_extractor import DOCUMENT_SPECS, HOUSING_DOCUMENT_SPEC, PARKING_TICKET_SPEC, FieldSpec
+
+PARKING_TEXT = """CITY OF SPRINGFIELD
+PARKING VIOLATION
+TICKET NO: PK4829173
+Date: 03/14/2024
+Location: 125 Main ST
+Violation: EXPIRED METER
+PLATE: ABC1234
+FINE: $45.00"""
+
+HOUSING_TEXT = """NOTICE TO QUIT
+PROPERTY: 42 Oak Hill RD
+LANDLORD: Maple Properties
+RENT: $1200 per month
+Served 01/02/2024, vacate by 02/03/2024"""
+
+
+def test_parking_ticket_fields():
+    fields = PARKING_TICKET_SPEC.extract(PARKING_TEXT)
+    assert fields == {
+        "ticket_number": "PK4829173",
+        "issue_date": "03/14/2024",
+        "violation_description": "VIOLATION: EXPIRED METER",
+        "location": "125 Main ST",
+        "vehicle_info": "License Plate: ABC1234",
+        "amount": "$45.00",
+    }
+
+
+def test_housing_document_fields():
+    fields = HOUSING_DOCUMENT_SPEC.extract(HOUSING_TEXT)
+    assert fields["property_address"] == "42 Oak Hill RD"
+    assert fields["landlord_info"] == "Maple Properties"
+    assert fields["issue_type"] == "EVICTION"
+    assert fields["dates"] == "01/02/2024, 02/03/2024"
+    assert fields["rent_amount"] == "$1200"
+
+
+def test_missing_fields_are_empty():
+    for spec in DOCUMENT_SPECS.values():
+        fields = spec.extract("nothing to see here")
+        assert set(fields) == {name for name, _ in spec.fields}
+        assert not any(fields.values())
+
+
+def test_field_spec_requires_extract():
+    with pytest.raises(TypeError):
+        FieldSpec()
@@ -0,0 +1,176 @@
+import io
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from benchmarks.synthetic_documents import degrade, housing_notice_content, parking_ticket_content, render_page
+from utils import image_processor
+from utils.field_extractor import PARKING_TICKET_SPEC
+from utils.image_processor import (ORIENTATION_AXIS_RATIO, TESSERACT_CONFIG, ImageProcessor, ImageQualityError,
+                                   ImageTooLargeError, UnsupportedImageError, check_upload_limits)
+
+
+class FakeEngine:
+    """Reports a fixed row of words for the region strip; a field re-read returns reread,
+    or the crop's width when none is given."""
+
+    def __init__(self, words, reread=None):
+        self.words = words
+        self.reread = reread
+
+    def image_to_data(self, image, config=None):
+        if config != TESSERACT_CONFIG:
+            return {"text": [self.reread or f"w{image.shape[1]}"], "conf": [95.0]}
+        count = len(self.words)
+        return {
+            "text": list(self.words),
+            "left": [i * 50 for i in range(count)],
+            "top": [12] * count,
+            "width": [40] * count,
+            "height": [20] * count,
+            "conf": [90] * count,
+            "block_num": [1] * count,
+            "par_num": [1] * count,
+            "line_num": [1] * count,
+        }
+
+
+@pytest.fixture
+def processor():
+    processor = ImageProcessor()
+    # No Tesseract here: OSD never answers
+    processor.detect_orientation = lambda gray: None
+    return processor
+
+
+def use_fake_regions(processor, words, reread=None):
+    processor.engine = FakeEngine(words, reread)
+    processor.detect_text_regions = lambda binary: [(0, 0, 50 * len(words), 30)]
+
+
+def read_regions(processor, words):
+    use_fake_regions(processor, words)
+    return processor.extract_parking_regions(np.full((1000, 1000), 255, dtype=np.uint8))
+
+
+def test_region_labels_match_whole_words_only(processor):
+    result = read_regions(processor, ["POLICE", "PUBLIC", "PREFERRED", "OVERDUE", "X123"])
+    assert result["refined_fields"] == {}
+
+
+def test_region_line_with_several_labels(processor):
+    result = read_regions(processor, ["TICKET", "NO", "A123", "FINE", "$45", "PLATE:", "XYZ9"])
+    # Each value is re-read from the words between its label and the next one
+    # (one 40 px word plus 4 px of padding on each side)
+    assert result["refined_fields"] == {"ticket_number": "w48", "amount": "w48", "vehicle_info": "w48"}
+    assert result["regions"][0]["field"] == "ticket_number"
+
+
+
+def test_corrected_field_keeps_its_own_confidence(processor):
+    # The strip misreads the last digit; the field re-read gets it right
+    use_fake_regions(processor, ["TICKET", "NO", "PK482917B", "ISSUED", "03/14/2024"], reread="PK4829173")
+    result = processor.run_ocr_pass(np.full((1000, 1000), 255, dtype=np.uint8), PARKING_TICKET_SPEC, True)
+    assert result["fields"]["ticket_number"] == "PK4829173"
+    assert result["required_found"] == 2
+    assert result["complete"]
+
+@pytest.mark.parametrize("make_content", [parking_ticket_content, housing_notice_content])
+def test_shaded_upright_page_is_not_turned(processor, make_content):
+    rng = random.Random(1)
+    content = make_content(rng)
+    page = degrade(render_page(content["lines"], content["headings"]),
+                   {"shading": True, "noise": 8.0, "blur": 0.8}, rng)
+
+    _, info = processor.correct_orientation(np.asarray(page))
+    assert info["rotation"] == 0
+    assert info["axis_ratio"] >= ORIENTATION_AXIS_RATIO
+    assert "osd_checked" not in info
+
+
+def test_sideways_page_needs_osd_to_turn(processor):
+    rng = random.Random(2)
+    content = parking_ticket_content(rng)
+    page = render_page(content["lines"], content["headings"]).rotate(90, expand=True)
+
+    _, info = processor.correct_orientation(np.asarray(page))
+    assert info["osd_checked"]
+    assert info["rotation"] == 0
+
+    processor.detect_orientation = lambda gray: 270
+    _, info = processor.correct_orientation(np.asarray(page))
+    assert info["method"] == "osd"
+    assert info["rotation"] == 270
+
+
+def hdr_image(width, height):
+    """A Radiance HDR file: OpenCV decodes it, PIL cannot read its header."""
+    ok, encoded = cv2.imencode(".hdr", np.full((height, width, 3), 0.5, dtype=np.float32))
+    assert ok
+    return encoded.tobytes()
+
+
+def test_upload_with_unreadable_header_is_rejected(processor):
+    with pytest.raises(UnsupportedImageError):
+        check_upload_limits(hdr_image(2000, 2000))
+    with pytest.raises(UnsupportedImageError):
+        processor.load_grayscale(hdr_image(64, 64))
+
+
+def test_pixel_limit_is_read_from_the_header(monkeypatch):
+    buffer = io.BytesIO()
+    Image.new("L", (2000, 2000), 255).save(buffer, "PNG")
+    assert check_upload_limits(buffer.getvalue()) == (2000, 2000)
+
+    monkeypatch.setattr(image_processor, "MAX_IMAGE_PIXELS", 1000 * 1000)
+    with pytest.raises(ImageTooLargeError):
+        check_upload_limits(buffer.getvalue())
+
+
+def test_cascade_reports_unsupported_upload(processor):
+    result = processor.run_ocr_cascade(hdr_image(64, 64), PARKING_TICKET_SPEC)
+    assert result["text"] == "Error: Unsupported image format."
+    assert not result["quality"]["acceptable"]
+
+
+def fake_ocr_document(document_type, image):
+    if image == b"bad":
+        raise ValueError("unreadable image")
+    if image == b"blurry":
+        return {"text": "", "fields": {}, "quality": {"acceptable": False, "issues": ["blurry"]}}
+    return {"text": image.decode(), "fields": {"text": image.decode()}, "quality": {"acceptable": True}}
+
+
+@pytest.mark.parametrize("use_pool", [False, True])
+def test_batch_isolates_failed_images(processor, monkeypatch, use_pool):
+    monkeypatch.setattr(image_processor, "ocr_document", fake_ocr_document)
+    images = [b"one", b"bad", b"blurry", b"four"]
+    if use_pool:
+        # Threads share the patched module, unlike worker processes
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = sorted(processor.analyze_housing_batch(images, max_workers=2, executor=pool),
+                             key=lambda item: item[0])
+    else:
+        results = list(processor.analyze_housing_batch(images, max_workers=1))
+
+    assert [(index, fields) for index, fields, _ in results] == [
+        (0, {"text": "one"}), (1, {}), (2, {}), (3, {"text": "four"})
+    ]
+    assert isinstance(results[1][2], ValueError)
+    assert isinstance(results[2][2], ImageQualityError) and results[2][2].issues == ["blurry"]
+
+
+def test_batch_reports_a_failing_image_source(processor, monkeypatch):
+    monkeypatch.setattr(image_processor, "ocr_document", fake_ocr_document)
+
+    def images():
+        yield b"one"
+        raise OSError("corrupt upload")
+
+    results = list(processor.analyze_parking_batch(images(), max_workers=1))
+    assert [(index, fields) for index, fields, _ in results] == [(0, {"text": "one"}), (1, {})]
+    assert isinstance(results[1][2], OSError)
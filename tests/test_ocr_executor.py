@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from utils import document_pages
+from utils.document_pages import UnsupportedDocumentError, iter_pages
+from utils.ocr_executor import OCRExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = OCRExecutor(max_workers=1)
+
+    async def fake_analyze(document_type, content):
+        if content == b"bad":
+            raise ValueError("unreadable page")
+        return {"text": content.decode()}
+
+    # Stand in for the worker pool so only the scheduling is exercised
+    executor._analyze = fake_analyze
+    yield executor
+    executor.shutdown()
+
+
+def collect(executor, pages, on_page=None):
+    async def run():
+        return [item async for item in executor.analyze_pages("housing", pages, on_page=on_page)]
+    return sorted(asyncio.run(run()), key=lambda item: item[0])
+
+
+def failing_load():
+    raise OSError("cannot render page")
+
+
+def test_failed_pages_do_not_stop_the_others(executor):
+    pages = [
+        {"content": b"one", "text": None},
+        {"load": failing_load},
+        {"content": b"bad", "text": None},
+        {"load": lambda: {"content": b"four", "text": None}},
+    ]
+    rendered = []
+    results = collect(executor, pages, on_page=lambda index, page: rendered.append(index))
+
+    assert [(index, fields) for index, fields, _ in results] == [
+        (0, {"text": "one"}), (1, {}), (2, {}), (3, {"text": "four"})
+    ]
+    assert isinstance(results[1][2], OSError)
+    assert isinstance(results[2][2], ValueError)
+    # on_page only sees pages that rendered
+    assert sorted(rendered) == [0, 2, 3]
+
+
+def test_failing_page_iterator_is_reported_as_the_next_page(executor):
+    def pages():
+        yield {"content": b"one", "text": None}
+        raise RuntimeError("corrupt upload")
+
+    results = collect(executor, pages())
+    assert [(index, fields) for index, fields, _ in results] == [(0, {"text": "one"}), (1, {})]
+    assert isinstance(results[1][2], RuntimeError)
+
+
+def test_unreadable_file_is_one_failed_page(executor):
+    pages = list(iter_pages(b"not a tiff", "image/tiff"))
+    results = collect(executor, pages + [{"content": b"two", "text": None}])
+    assert results[0][1] == {} and results[0][2] is not None
+    assert results[1] == (1, {"text": "two"}, None)
+
+
+def test_text_layer_skips_ocr(executor):
+    page = {"content": None, "text": "TICKET NO: PK4829173\nDate: 03/14/2024"}
+    fields = asyncio.run(executor.analyze_page("parking", page))
+    assert fields["ticket_number"] == "PK4829173"
+
+
+def test_pdf_without_pymupdf_is_a_reported_page_error(executor, monkeypatch):
+    monkeypatch.setattr(document_pages, "fitz", None)
+    results = collect(executor, iter_pages(b"%PDF-1.4", "application/pdf"))
+    assert len(results) == 1
+    assert isinstance(results[0][2], UnsupportedDocumentError)
+    assert "PDF uploads are not supported" in str(results[0][2])
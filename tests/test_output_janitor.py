@@ -0,0 +1,44 @@
+import os
+import time
+
+from utils.output_janitor import OutputJanitor
+
+
+def touch(directory, name, size=10, age=0):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_only_generated_documents_are_removed(tmp_path):
+    janitor = OutputJanitor(output_dir=str(tmp_path), max_age_seconds=3600, max_bytes=1024 * 1024)
+    old = 2 * 3600
+    touch(tmp_path, "parking_dispute_20240314_101500_0123456789ab.docx", age=old)
+    touch(tmp_path, "housing_dispute_20240314_101500_0123456789ab.pdf", age=old)
+    touch(tmp_path, "notes.txt", age=old)
+    touch(tmp_path, "report.pdf", age=old)
+
+    assert janitor.sweep() == 2
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt", "report.pdf"]
+
+
+def test_size_quota_evicts_oldest_documents(tmp_path):
+    janitor = OutputJanitor(output_dir=str(tmp_path), max_age_seconds=3600, max_bytes=250)
+    touch(tmp_path, "parking_dispute_a.docx", size=100, age=30)
+    touch(tmp_path, "parking_dispute_b.docx", size=100, age=20)
+    touch(tmp_path, "parking_dispute_c.docx", size=100, age=10)
+    touch(tmp_path, "unrelated.bin", size=1000, age=40)
+
+    assert janitor.sweep() == 1
+    assert sorted(os.listdir(tmp_path)) == ["parking_dispute_b.docx", "parking_dispute_c.docx", "unrelated.bin"]
+
+
+def test_in_flight_writes_are_left_alone(tmp_path):
+    janitor = OutputJanitor(output_dir=str(tmp_path), max_age_seconds=3600, max_bytes=50)
+    touch(tmp_path, "parking_dispute_a.docx.123.tmp", size=100)
+    touch(tmp_path, "parking_dispute_b.docx.456.tmp", size=100, age=2 * 3600)
+
+    assert janitor.sweep() == 1
+    assert os.listdir(tmp_path) == ["parking_dispute_a.docx.123.tmp"]
@@ -0,0 +1,67 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import date
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from templates.document_templates import TEMPLATE_VERSION
+
+
+class DocumentCache:
+    """In-memory LRU of generated documents keyed by the case they were built from.
+
+    Bounded by entry count and total document bytes, evicting the least recently used.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("APPEALAI_DOCUMENT_CACHE_ENTRIES", "128"))
+        self.max_bytes = max_bytes or int(os.getenv("APPEALAI_DOCUMENT_CACHE_MAX_MB", "32")) * 1024 * 1024
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(document_type: str, data: Dict[str, Any], file_format: str = "docx") -> str:
+        """Build a cache key from the case data, dispute type, file format, template version and date.
+
+        The data is serialized with sorted keys so the order answers were collected in does
+        not matter. The date is included because it is printed in the document.
+        """
+        digest = hashlib.sha256()
+        prefix = f"{document_type}\0{file_format}\0{TEMPLATE_VERSION}\0{date.today().isoformat()}\0"
+        digest.update(prefix.encode("utf-8"))
+        digest.update(json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached document for a key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry)
+
+    def put(self, key: str, document: Dict[str, Any]):
+        """Store a generated document, evicting the least recently used ones to fit."""
+        size = len(document["content"])
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous["content"])
+            self._entries[key] = dict(document)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted["content"])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -1,137 +1,294 @@
+import io
 import os
+import copy
+import uuid
+import atexit
+import asyncio
+import threading
 from datetime import datetime
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Sequence
 from docx import Document
+from docx.document import Document as DocxDocument
 from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-import asyncio
 
-from templates.document_templates import format_parking_dispute, format_housing_dispute
+from templates.document_templates import (HEADER, SUBTITLE, Section, housing_dispute_sections, parking_dispute_sections,
+                                          section_paragraphs)
+from .document_cache import DocumentCache
+from .pdf_renderer import PDF_MIME_TYPE, get_styles, render_pdf
+from .timing import get_timing_registry
 
-class DocumentGenerator:
-    """Handles document generation for parking and housing disputes."""
+# Stage timings for this process
+_timings = get_timing_registry()
+
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class DocumentSkeleton:
+    """The static part of a dispute document, built once per process and reused.
     
-    def __init__(self):
-        self.output_dir = "output"
-        # Create output directory if it doesn't exist
-        os.makedirs(self.output_dir, exist_ok=True)
+    Document() parses the default template package from disk, so each document type
+    keeps one parsed document with its margins and title already set. A request only
+    resets the body to a copy of those skeleton paragraphs, which takes microseconds;
+    styles and the rest of the package are shared.
+    """
     
-    async def generate_parking_dispute(self, data: Dict[str, Any]) -> str:
-        """Generate a parking ticket dispute document."""
-        # Format the document content
-        content = format_parking_dispute(data)
-        
-        # Create Word document
-        doc = Document()
+    def __init__(self, title: str):
+        self.document = Document()
         
         # Set margins
-        sections = doc.sections
-        for section in sections:
+        for section in self.document.sections:
             section.top_margin = Inches(1)
             section.bottom_margin = Inches(1)
             section.left_margin = Inches(1)
             section.right_margin = Inches(1)
         
         # Add title
-        title = doc.add_heading('PARKING CITATION DISPUTE', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add a subtitle
-        subtitle = doc.add_paragraph()
-        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        subtitle_run = subtitle.add_run(f"Citation Number: {data.get('ticket_number', 'N/A')}")
-        subtitle_run.bold = True
+        heading = self.document.add_heading(title, 0)
+        heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
         
-        # Add document content
-        paragraphs = content.split('\n\n')
-        for paragraph_text in paragraphs:
-            if paragraph_text.strip():
-                if paragraph_text.strip().startswith('RE:') or paragraph_text.strip().startswith('VEHICLE INFORMATION:') or \
-                   paragraph_text.strip().startswith('VIOLATION ALLEGED:') or paragraph_text.strip().startswith('GROUNDS FOR DISPUTE:') or \
-                   paragraph_text.strip().startswith('SUPPORTING EVIDENCE:') or paragraph_text.strip().startswith('LEGAL BASIS FOR DISMISSAL:') or \
-                   paragraph_text.strip().startswith('CONCLUSION:') or paragraph_text.strip().startswith('ATTACHMENTS:'):
-                    # Headers in bold
-                    p = doc.add_paragraph()
-                    p.add_run(paragraph_text.strip()).bold = True
-                else:
-                    # Regular paragraphs
-                    doc.add_paragraph(paragraph_text.strip())
+        self._body = [copy.deepcopy(element) for element in self.document.element.body]
+        # Requests share one document, so they take turns filling it in
+        self.lock = threading.Lock()
+    
+    def fresh_document(self) -> DocxDocument:
+        """The skeleton document with everything a previous request added removed.
         
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"parking_dispute_{timestamp}.docx"
-        filepath = os.path.join(self.output_dir, filename)
+        Hold the lock until the document has been saved.
+        """
+        self.document.element.body[:] = [copy.deepcopy(element) for element in self._body]
+        return self.document
+
+
+# Document type -> title of its skeleton
+_TITLES = {
+    "parking": "PARKING CITATION DISPUTE",
+    "housing": "FORMAL HOUSING COMPLAINT",
+}
+
+_skeletons: Dict[str, DocumentSkeleton] = {}
+_skeletons_lock = threading.Lock()
+
+
+def get_skeleton(document_type: str) -> DocumentSkeleton:
+    """Return this process's skeleton for a document type, building it on first use."""
+    with _skeletons_lock:
+        skeleton = _skeletons.get(document_type)
+        if skeleton is None:
+            skeleton = _skeletons[document_type] = DocumentSkeleton(_TITLES[document_type])
+        return skeleton
+
+
+def _add_sections(doc: DocxDocument, sections: List[Section]):
+    """Add a document's sections after its title; shared by every document type."""
+    for kind, text in section_paragraphs(sections):
+        if kind == SUBTITLE:
+            subtitle = doc.add_paragraph()
+            subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            subtitle.add_run(text).bold = True
+        elif kind == HEADER:
+            # Headers in bold
+            doc.add_paragraph().add_run(text).bold = True
+        else:
+            # Regular paragraphs
+            doc.add_paragraph(text)
+
+
+# Document type -> function building that document's sections from the case data
+_SECTION_BUILDERS = {
+    "parking": parking_dispute_sections,
+    "housing": housing_dispute_sections,
+}
+
+
+def init_docgen_worker():
+    """Build every skeleton and the PDF styles when a worker starts so no request pays for them."""
+    for document_type in _TITLES:
+        get_skeleton(document_type)
+    get_styles()
+
+
+def _render_docx(document_type: str, sections: List[Section]) -> bytes:
+    skeleton = get_skeleton(document_type)
+    with skeleton.lock:
+        doc = skeleton.fresh_document()
+        _add_sections(doc, sections)
         
         # Save document
-        doc.save(filepath)
-        
-        return os.path.abspath(filepath)
+        buffer = io.BytesIO()
+        with _timings.stage("docgen.save"):
+            doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _render_pdf(document_type: str, sections: List[Section]) -> bytes:
+    with _timings.stage("docgen.pdf"):
+        return render_pdf(_TITLES[document_type], sections)
+
+
+# File format -> (renderer, MIME type)
+FORMATS = {
+    "docx": (_render_docx, DOCX_MIME_TYPE),
+    "pdf": (_render_pdf, PDF_MIME_TYPE),
+}
+
+
+def render_document(document_type: str, data: Dict[str, Any], output_dir: Optional[str] = None,
+                    file_format: str = "docx") -> Dict[str, Any]:
+    """Worker entry point: build one dispute document in memory as .docx or .pdf.
     
-    async def generate_housing_dispute(self, data: Dict[str, Any]) -> str:
-        """Generate a housing dispute document."""
+    Returns the file bytes under "content" with a unique "id", a "filename" and the "mime"
+    type. When output_dir is given the document is also written there and its absolute
+    "path" returned. The call's stage timings are returned under "timings".
+    """
+    renderer, mime = FORMATS[file_format]
+    with _timings.capture() as timings:
         # Format the document content
-        content = format_housing_dispute(data)
-        
-        # Create Word document
-        doc = Document()
+        with _timings.stage("docgen.format"):
+            sections = _SECTION_BUILDERS[document_type](data)
+        content = renderer(document_type, sections)
         
-        # Set margins
-        sections = doc.sections
-        for section in sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
+        # Generate filename with timestamp and a random id so concurrent requests never collide
+        document_id = uuid.uuid4().hex
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{document_type}_dispute_{timestamp}_{document_id[:12]}.{file_format}"
         
-        # Add title
-        title = doc.add_heading('FORMAL HOUSING COMPLAINT', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        path = None
+        if output_dir:
+            path = os.path.abspath(os.path.join(output_dir, filename))
+            with _timings.stage("docgen.write"):
+                # Write to a temporary file first so the janitor and readers never see a partial document
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+    
+    return {"id": document_id, "filename": filename, "mime": mime, "content": content, "path": path,
+            "timings": timings}
+
+
+class DocumentGenerator:
+    """Handles document generation for parking and housing disputes.
+    
+    python-docx is pure Python and holds the GIL, so documents are built in a small
+    process pool and the coroutines only await the result. A semaphore caps how many
+    generations are queued or running at once so a burst of requests cannot tie up
+    the pool and the event loop.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, max_concurrent: Optional[int] = None,
+                 save_to_disk: Optional[bool] = None, cache: Optional[DocumentCache] = None):
+        self.output_dir = os.getenv("APPEALAI_OUTPUT_DIR", "output")
+        # Documents are delivered from memory; keeping a copy on disk is optional
+        if save_to_disk is None:
+            save_to_disk = os.getenv("APPEALAI_SAVE_DOCUMENTS", "0") == "1"
+        self.save_to_disk = save_to_disk
+        if self.save_to_disk:
+            # Create output directory if it doesn't exist
+            os.makedirs(self.output_dir, exist_ok=True)
+        # Pool size and the number of generations admitted at once can be tuned through the environment
+        self.max_workers = max_workers or int(os.getenv("APPEALAI_DOCGEN_WORKERS", "2"))
+        self.max_concurrent = max_concurrent or int(
+            os.getenv("APPEALAI_DOCGEN_CONCURRENCY", str(self.max_workers * 2))
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Regenerating an unchanged case returns the cached document without any python-docx work
+        if cache is None and os.getenv("APPEALAI_DOCUMENT_CACHE", "1") != "0":
+            cache = DocumentCache()
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.shutdown)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Document generator has been shut down")
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_docgen_worker)
+            return self._executor
+    
+    def _reset_executor(self, broken: ProcessPoolExecutor):
+        """Drop a pool whose worker died so the next document starts a fresh one."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+    
+    async def _render(self, document_type: str, data: Dict[str, Any], file_format: str = "docx") -> Dict[str, Any]:
+        """Return the cached document for this case when there is one, otherwise build it in the pool."""
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported document format: {file_format}")
         
-        # Add a subtitle
-        subtitle = doc.add_paragraph()
-        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        property_info = data.get("property_info", "")
-        property_address = "N/A"
-        for line in property_info.split('\n'):
-            if line.lower().startswith("property address:") or line.lower().startswith("address:"):
-                property_address = line.split(":", 1)[1].strip()
-                break
-        subtitle_run = subtitle.add_run(f"Property: {property_address}")
-        subtitle_run.bold = True
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(document_type, data, file_format)
+            cached = self.cache.get(key)
+            # A saved copy may have been cleaned up since; build it again in that case
+            if cached is not None and (not self.save_to_disk or os.path.exists(cached["path"] or "")):
+                return cached
         
-        # Add document content
-        paragraphs = content.split('\n\n')
-        for paragraph_text in paragraphs:
-            if paragraph_text.strip():
-                if paragraph_text.strip().startswith('RE:') or paragraph_text.strip().startswith('PROPERTY INFORMATION:') or \
-                   paragraph_text.strip().startswith('ISSUE DESCRIPTION:') or paragraph_text.strip().startswith('TIMELINE OF EVENTS:') or \
-                   paragraph_text.strip().startswith('PREVIOUS ATTEMPTS AT RESOLUTION:') or paragraph_text.strip().startswith('IMPACT ON HABITABILITY:') or \
-                   paragraph_text.strip().startswith('REQUESTED RESOLUTION:') or paragraph_text.strip().startswith('LEGAL OBLIGATIONS:') or \
-                   paragraph_text.strip().startswith('SUPPORTING DOCUMENTATION:') or paragraph_text.strip().startswith('TIMELINE FOR RESPONSE:') or \
-                   paragraph_text.strip().startswith('NEXT STEPS:') or paragraph_text.strip().startswith('COPIES SENT TO:') or \
-                   paragraph_text.strip().startswith('ATTACHMENTS:'):
-                    # Headers in bold
-                    p = doc.add_paragraph()
-                    p.add_run(paragraph_text.strip()).bold = True
-                else:
-                    # Regular paragraphs
-                    doc.add_paragraph(paragraph_text.strip())
+        # Wait for a free slot so bursts queue here instead of in the pool
+        async with self._semaphore:
+            executor = self._get_executor()
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(executor, render_document, document_type, data,
+                                                    self.output_dir if self.save_to_disk else None, file_format)
+            except BrokenProcessPool:
+                self._reset_executor(executor)
+                raise
+        # Fold the worker's stage timings into this process's histograms
+        _timings.merge(result.pop("timings"))
         
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"housing_dispute_{timestamp}.docx"
-        filepath = os.path.join(self.output_dir, filename)
+        if key is not None:
+            self.cache.put(key, result)
+        return dict(result)
+    
+    @_timings.timed("docgen.generate_parking_dispute")
+    async def generate_parking_dispute(self, data: Dict[str, Any], file_format: str = "docx") -> Dict[str, Any]:
+        """Generate a parking ticket dispute document as "docx" or "pdf".
         
-        # Save document
-        doc.save(filepath)
+        Returns the document's unique "id", "filename" and "mime" type, its bytes as "content",
+        and its "path" when documents are also saved to disk (None otherwise).
+        """
+        return await self._render("parking", data, file_format)
+    
+    @_timings.timed("docgen.generate_housing_dispute")
+    async def generate_housing_dispute(self, data: Dict[str, Any], file_format: str = "docx") -> Dict[str, Any]:
+        """Generate a housing dispute document; same formats and keys as generate_parking_dispute."""
+        return await self._render("housing", data, file_format)
+    
+    @_timings.timed("docgen.generate_documents")
+    async def generate_documents(self, document_type: str, data: Dict[str, Any],
+                                 file_formats: Sequence[str] = ("docx", "pdf")) -> Dict[str, Dict[str, Any]]:
+        """Generate the same case in several formats at once, each in its own worker.
         
-        return os.path.abspath(filepath)
+        Returns the generated documents keyed by format.
+        """
+        documents = await asyncio.gather(
+            *(self._render(document_type, data, file_format) for file_format in file_formats)
+        )
+        return dict(zip(file_formats, documents))
     
     def create_simple_text_document(self, content: str, filename: str) -> str:
         """Create a simple text document as fallback."""
+        os.makedirs(self.output_dir, exist_ok=True)
         filepath = os.path.join(self.output_dir, f"{filename}.txt")
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        return os.path.abspath(filepath)
\ No newline at end of file
+        return os.path.abspath(filepath)
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool, cancelling documents that have not started."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,139 @@
+import io
+import functools
+import threading
+from PIL import Image
+from typing import Any, Dict, Iterator, Optional
+
+from .image_processor import (MAX_IMAGE_PIXELS, MAX_UPLOAD_BYTES, OCR_MAX_DIMENSION, ImageTooLargeError,
+                              check_upload_limits)
+
+try:
+    # Optional: needed to read PDF uploads
+    import fitz
+except ImportError:
+    fitz = None
+
+PDF_MIME_TYPES = ("application/pdf",)
+TIFF_MIME_TYPES = ("image/tiff", "image/tif")
+
+# A PDF page whose text layer has at least this many letters and digits is read without OCR
+MIN_TEXT_LAYER_CHARS = 40
+
+# One page of an upload: encoded image bytes to OCR, or text read from the PDF text layer.
+# Pages of multi-page files start out as {"load": callable} until load_page renders them.
+Page = Dict[str, Any]
+
+# MuPDF is not thread-safe, so PDF work is done one page at a time
+_pdf_lock = threading.Lock()
+
+
+class UnsupportedDocumentError(ValueError):
+    """Raised for uploads this server cannot read."""
+
+
+def is_supported_upload(mime: Optional[str]) -> bool:
+    """Whether an uploaded file can be analyzed: any image, or a PDF."""
+    return bool(mime) and (mime.startswith("image/") or mime in PDF_MIME_TYPES)
+
+
+def _open_pdf(content: bytes):
+    if fitz is None:
+        raise UnsupportedDocumentError(
+            "PDF uploads are not supported on this server. Please upload photos or screenshots of the pages instead."
+        )
+    if len(content) > MAX_UPLOAD_BYTES:
+        raise ImageTooLargeError([
+            f"The file is too large ({len(content) / (1024 * 1024):.1f} MB). Please upload a file under "
+            f"{MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+        ])
+    return fitz.open(stream=content, filetype="pdf")
+
+
+def count_pages(content: bytes, mime: Optional[str]) -> int:
+    """Number of pages in an upload, read without rendering any of them."""
+    if mime in PDF_MIME_TYPES:
+        with _pdf_lock, _open_pdf(content) as document:
+            return document.page_count
+    if mime in TIFF_MIME_TYPES:
+        check_upload_limits(content)
+        with Image.open(io.BytesIO(content)) as image:
+            return getattr(image, "n_frames", 1)
+    return 1
+
+
+def _encode_page(page: Image.Image) -> bytes:
+    """Encode a page for OCR at no more than OCR resolution."""
+    page = page.convert("L")
+    # OCR shrinks larger pages anyway; shrinking first keeps the encoded page small
+    page.thumbnail((OCR_MAX_DIMENSION, OCR_MAX_DIMENSION), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    # Lossless and quick to encode; the bytes only live until the page is OCR'd
+    page.save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def _render_pdf_page(content: bytes, index: int) -> Page:
+    """Read one PDF page: its text layer when it has one, otherwise a rendering for OCR."""
+    # Each page reopens the document so a page can be rendered on its own, by any thread
+    with _pdf_lock, _open_pdf(content) as document:
+        page = document.load_page(index)
+        
+        # Digital PDFs carry their text; only scanned pages need OCR
+        text = page.get_text("text")
+        if sum(character.isalnum() for character in text) >= MIN_TEXT_LAYER_CHARS:
+            return {"content": None, "text": text}
+        
+        # Render straight at OCR resolution rather than at a fixed DPI
+        zoom = OCR_MAX_DIMENSION / max(page.rect.width, page.rect.height)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+        return {"content": pixmap.tobytes("png"), "text": None}
+
+
+def _render_tiff_frame(content: bytes, index: int) -> Page:
+    """Decode one TIFF frame for OCR."""
+    with Image.open(io.BytesIO(content)) as image:
+        image.seek(index)
+        # Each frame has its own header; check it before decoding the frame
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise ImageTooLargeError([
+                f"Page {index + 1} has too many pixels. Please upload pages under "
+                f"{MAX_IMAGE_PIXELS // 1000000} megapixels."
+            ])
+        return {"content": _encode_page(image), "text": None}
+
+
+def iter_pages(content: bytes, mime: Optional[str], max_pages: Optional[int] = None) -> Iterator[Page]:
+    """Yield the pages of an upload one at a time.
+    
+    PDF pages and TIFF frames come back unrendered, as {"load": callable}; load_page
+    renders one when it is needed, so memory stays flat however many pages there are and
+    a page that fails to render fails on its own. A file that cannot be opened at all is
+    a single page that fails to load. Any other image is a single page.
+    """
+    if mime in PDF_MIME_TYPES or mime in TIFF_MIME_TYPES:
+        render = _render_pdf_page if mime in PDF_MIME_TYPES else _render_tiff_frame
+        try:
+            page_count = count_pages(content, mime)
+        except Exception as e:
+            # An unreadable file is one failed page, so other uploads are still read
+            return iter([{"load": functools.partial(_raise, e)}])
+        if max_pages is not None:
+            page_count = min(page_count, max_pages)
+        return ({"load": functools.partial(render, content, index)} for index in range(page_count))
+    return iter([{"content": content, "text": None}])
+
+
+def _raise(error: Exception) -> Page:
+    raise error
+
+
+def load_page(page: Page) -> Page:
+    """Render a page from iter_pages if it has not been rendered yet."""
+    return page["load"]() if "load" in page else page
+
+
+def first_page(content: bytes, mime: Optional[str]) -> Page:
+    """The first page of an upload, rendered."""
+    for page in iter_pages(content, mime, max_pages=1):
+        return load_page(page)
+    raise ValueError("The uploaded document has no pages")
@@ -0,0 +1,196 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple, Union
+
+from .timing import get_timing_registry
+
+# Stage timings for this process
+_timings = get_timing_registry()
+
+# A pattern, optionally paired with literals of which at least one must occur for it to match
+PatternEntry = Union[str, Tuple[str, Sequence[str]]]
+
+
+class FieldSpec(ABC):
+    """Base class for a declaratively specified field; compiled once at import."""
+
+    def __init__(self, upper: bool = False, template: str = "{}"):
+        # Whether the field is matched against the uppercased text
+        self.upper = upper
+        # How a matched value is presented, e.g. "${}" for amounts
+        self.template = template
+
+    @abstractmethod
+    def extract(self, text: str, upper_text: str) -> str:
+        """Return the field's value from the original and uppercased text, or ""."""
+
+
+class PatternField(FieldSpec):
+    """First capture of the first pattern, in priority order, that matches anywhere."""
+
+    def __init__(self, patterns: Sequence[PatternEntry], upper: bool = False, template: str = "{}"):
+        super().__init__(upper, template)
+        self.patterns: List[Tuple[re.Pattern, Tuple[str, ...]]] = []
+        for entry in patterns:
+            pattern, anchors = (entry, ()) if isinstance(entry, str) else entry
+            self.patterns.append((re.compile(pattern), tuple(anchors)))
+
+    def extract(self, text: str, upper_text: str) -> str:
+        source = upper_text if self.upper else text
+        for pattern, anchors in self.patterns:
+            # Plain substring checks are far cheaper than a failing regex scan
+            if anchors and not any(anchor in source for anchor in anchors):
+                continue
+            match = pattern.search(source)
+            if match:
+                return self.template.format(match.group(1))
+        return ""
+
+
+class FindAllField(FieldSpec):
+    """Every match of a pattern, joined, up to a limit."""
+
+    def __init__(self, pattern: str, limit: int, separator: str = ", ", upper: bool = False):
+        super().__init__(upper)
+        self.pattern = re.compile(pattern)
+        self.limit = limit
+        self.separator = separator
+
+    def extract(self, text: str, upper_text: str) -> str:
+        source = upper_text if self.upper else text
+        values = []
+        for match in self.pattern.finditer(source):
+            values.append(match.group(1))
+            if len(values) == self.limit:
+                break
+        return self.separator.join(values)
+
+
+class KeywordLineField(FieldSpec):
+    """The first line of the uppercased text that contains any of the keywords."""
+
+    def __init__(self, keywords: Sequence[str]):
+        super().__init__(upper=True)
+        self.keywords = tuple(keywords)
+
+    def extract(self, text: str, upper_text: str) -> str:
+        # The earliest keyword occurrence sits on the first line containing any keyword
+        positions = [position for position in (upper_text.find(keyword) for keyword in self.keywords)
+                     if position != -1]
+        if not positions:
+            return ""
+        first = min(positions)
+        start = upper_text.rfind("\n", 0, first) + 1
+        end = upper_text.find("\n", first)
+        return upper_text[start:end if end != -1 else len(upper_text)].strip()
+
+
+class KeywordTableField(FieldSpec):
+    """The highest-priority label whose keywords appear anywhere in the uppercased text."""
+
+    def __init__(self, table: Sequence[Tuple[str, Sequence[str]]]):
+        super().__init__(upper=True)
+        self.table = [(label, tuple(keywords)) for label, keywords in table]
+
+    def extract(self, text: str, upper_text: str) -> str:
+        for label, keywords in self.table:
+            if any(keyword in upper_text for keyword in keywords):
+                return label
+        return ""
+
+
+class ConstantField(FieldSpec):
+    """A field reported with a fixed value (not yet extracted from text)."""
+
+    def __init__(self, value: str = ""):
+        super().__init__()
+        self.value = value
+
+    def extract(self, text: str, upper_text: str) -> str:
+        return self.value
+
+
+class DocumentSpec:
+    """Ordered collection of field specs for one document type."""
+
+    def __init__(self, name: str, fields: Sequence[Tuple[str, FieldSpec]], required: Sequence[str] = ()):
+        self.name = name
+        self.fields: List[Tuple[str, FieldSpec]] = list(fields)
+        self.field_names = [field_name for field_name, _ in self.fields]
+        # Fields that must be read for an OCR result to count as complete
+        self.required = tuple(required)
+
+    @_timings.timed("fields.extract")
+    def extract(self, text: str) -> Dict[str, str]:
+        """Extract every field from OCR text, uppercasing it only once."""
+        # OCR failures come back as an error message, which must not be read as data
+        if not text or text.startswith("Error:"):
+            return {field_name: "" for field_name in self.field_names}
+
+        upper_text = text.upper()
+        return {field_name: spec.extract(text, upper_text) for field_name, spec in self.fields}
+
+
+# Street address patterns shared by both document types
+_STREET_SUFFIXES = r'(?:ST|AVE|BLVD|RD|DR|LN|CT|PL)'
+_STREET_WORDS = r'(?:STREET|AVENUE|BOULEVARD|ROAD|DRIVE|LANE)'
+_STREET_WORD_ANCHORS = ("STREET", "AVENUE", "BOULEVARD", "ROAD", "DRIVE", "LANE")
+
+PARKING_TICKET_SPEC = DocumentSpec("parking", [
+    ("ticket_number", PatternField([
+        r'(?:TICKET|CITATION|NO\.?)\s*:?\s*([A-Z0-9\-]{6,15})',
+        (r'(?:NOTICE|REF|ID)\s*:?\s*([A-Z0-9\-]{6,15})', ("NOTICE", "REF", "ID")),
+        r'([A-Z0-9]{8,12})',  # Generic alphanumeric pattern
+    ], upper=True)),
+    ("issue_date", PatternField([
+        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'(\d{2,4}[/-]\d{1,2}[/-]\d{1,2})',
+        r'([A-Z][a-z]+ \d{1,2},? \d{4})',
+        r'(\d{1,2} [A-Z][a-z]+ \d{4})',
+    ])),
+    ("violation_description", KeywordLineField([
+        "METER", "EXPIRED", "NO PARKING", "FIRE HYDRANT", "HANDICAP",
+        "LOADING ZONE", "BUS ZONE", "OVERTIME", "BLOCKED", "DRIVEWAY",
+    ])),
+    ("location", PatternField([
+        r'(\d+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+' + _STREET_SUFFIXES + r')',
+        (r'([A-Z][A-Z\s]+' + _STREET_WORDS + r')', _STREET_WORD_ANCHORS),
+    ])),
+    ("vehicle_info", PatternField([
+        (r'(?:LIC|LICENSE|PLATE)\s*:?\s*([A-Z0-9\-]{3,8})', ("LIC", "PLATE")),
+    ], upper=True, template="License Plate: {}")),
+    ("amount", PatternField([
+        r'\$(\d+\.?\d*)',
+        r'FINE\s*:?\s*\$?(\d+\.?\d*)',
+        r'AMOUNT\s*:?\s*\$?(\d+\.?\d*)',
+    ], upper=True, template="${}")),
+], required=("ticket_number", "issue_date"))
+
+HOUSING_DOCUMENT_SPEC = DocumentSpec("housing", [
+    ("property_address", PatternField([
+        (r'(?:PROPERTY|ADDRESS|UNIT|APT)\s*:?\s*(\d+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+' + _STREET_SUFFIXES + r')',
+         ("PROPERTY", "ADDRESS", "UNIT", "APT")),
+        (r'(\d+\s+[A-Z][A-Z\s]+' + _STREET_WORDS + r')', _STREET_WORD_ANCHORS),
+    ])),
+    ("landlord_info", PatternField([
+        (r'(?:LANDLORD|OWNER|MANAGEMENT|COMPANY)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+         ("LANDLORD", "OWNER", "MANAGEMENT", "COMPANY")),
+        (r'(?:MANAGED BY|PROPERTY MANAGER)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', ("MANAGED BY", "PROPERTY MANAGER")),
+    ])),
+    ("issue_type", KeywordTableField([
+        ("LEASE", ["LEASE", "RENTAL AGREEMENT", "TENANCY"]),
+        ("MAINTENANCE", ["REPAIR", "MAINTENANCE", "BROKEN", "LEAK", "PEST"]),
+        ("EVICTION", ["EVICTION", "NOTICE TO QUIT", "TERMINATION"]),
+        ("DEPOSIT", ["DEPOSIT", "SECURITY", "REFUND"]),
+        ("NOTICE", ["NOTICE", "WARNING", "VIOLATION"]),
+    ])),
+    ("dates", FindAllField(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', limit=3)),
+    ("rent_amount", PatternField([
+        (r'(?:RENT|MONTHLY)\s*:?\s*\$?(\d+\.?\d*)', ("RENT", "MONTHLY")),
+        r'\$(\d{3,4}\.?\d*)(?:\s*(?:PER MONTH|MONTHLY|/MONTH))?',
+    ], upper=True, template="${}")),
+    ("lease_info", ConstantField()),
+], required=("property_address", "issue_type"))
+
+# Field specs by document type
+DOCUMENT_SPECS = {"parking": PARKING_TICKET_SPEC, "housing": HOUSING_DOCUMENT_SPEC}
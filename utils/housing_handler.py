@@ -1,7 +1,13 @@
+import os
+import asyncio
+import itertools
 import chainlit as cl
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from .image_processor import ImageProcessor
+from .document_pages import UnsupportedDocumentError, count_pages, iter_pages
+from .image_processor import ImageQualityError
+from .ocr_executor import get_ocr_executor
+from .preview_service import get_preview_service
 
 class HousingHandler:
     """Handler for collecting housing dispute information."""
@@ -18,7 +24,10 @@ class HousingHandler:
             "evidence",
             "tenant_info"
         ]
-        self.image_processor = ImageProcessor()
+        self.ocr_executor = get_ocr_executor()
+        self.preview_service = get_preview_service()
+        # Maximum number of pages analyzed per upload
+        self.max_pages = int(os.getenv("APPEALAI_MAX_HOUSING_PAGES", "10"))
         self.uploaded_image_data = None
         
     async def start_collection(self):
@@ -316,6 +325,7 @@ Does this information look correct?
     
     async def process_uploaded_images(self, files: list):
         """Process uploaded housing document images."""
+        preview_tasks: List[asyncio.Task] = []
         try:
             # Show processing message
             processing_msg = cl.Message(
@@ -333,34 +343,80 @@ Does this information look correct?
                 "lease_info": ""
             }
             
-            # Process each uploaded file
-            for i, file in enumerate(files[:3]):  # Process up to 3 files
-                # Save the uploaded file temporarily
-                temp_path = f"temp_housing_{i}_{file.name}"
-                with open(temp_path, "wb") as f:
-                    f.write(file.content)
-                
-                # Extract data from image
-                extracted_data = self.image_processor.analyze_housing_document(temp_path)
+            # Count pages across all uploads (PDF and TIFF files can hold several) without rendering them
+            page_counts = await asyncio.gather(
+                *(asyncio.to_thread(count_pages, file.content, file.mime) for file in files),
+                return_exceptions=True
+            )
+            # An unreadable file still counts as one (failed) page
+            page_counts = [1 if isinstance(count, Exception) else count for count in page_counts]
+            total_pages = sum(page_counts)
+            page_limit = min(total_pages, self.max_pages)
+            
+            # Respect the per-upload page cap and tell the user about the rest
+            if total_pages > page_limit:
+                await cl.Message(
+                    content=f"ℹ️ Only the first {page_limit} of {total_pages} uploaded pages will be analyzed.",
+                    author="AppealAI Assistant"
+                ).send()
+            
+            # Pages are rendered one at a time as the OCR pool has room for them
+            pages = itertools.islice(
+                itertools.chain.from_iterable(iter_pages(file.content, file.mime) for file in files),
+                page_limit
+            )
+            
+            # Build previews in the background while OCR runs
+            def start_preview(page_index: int, page: Dict[str, Any]):
+                if page["content"] is not None:
+                    preview_tasks.append(asyncio.create_task(self.preview_service.get_preview(page["content"])))
+            
+            # OCR pages concurrently and merge results as each one finishes
+            value_sources = {}
+            page_problems = {}
+            pages_read = 0
+            async for page_index, extracted_data, error in self.ocr_executor.analyze_pages("housing", pages, on_page=start_preview):
+                if isinstance(error, ImageQualityError):
+                    page_problems[page_index] = " ".join(error.issues)
+                elif isinstance(error, UnsupportedDocumentError):
+                    page_problems[page_index] = str(error)
+                elif error is not None:
+                    page_problems[page_index] = "This page could not be read."
+                else:
+                    pages_read += 1
                 
-                # Merge data (keep first non-empty values found)
+                # Merge data (values from earlier pages win, as with sequential processing)
                 for key, value in extracted_data.items():
-                    if value and not all_extracted_data.get(key):
+                    if value and page_index < value_sources.get(key, page_limit):
                         all_extracted_data[key] = value
+                        value_sources[key] = page_index
+            
+            # Tell the user about every page that could not be read, and ask for retakes
+            if page_problems or not pages_read:
+                page_notes = "\n".join(
+                    f"- **Page {page_index + 1}:** {problem}"
+                    for page_index, problem in sorted(page_problems.items())
+                )
+                if not pages_read:
+                    await cl.Message(
+                        content=f"📷 **I couldn't read your documents.**\n\n{page_notes}\n\nPlease upload new photos of your documents, or type **'manual'** to enter the information step-by-step.",
+                        author="AppealAI Assistant"
+                    ).send()
+                    cl.user_session.set("collection_step", "upload_choice")
+                    return
                 
-                # Clean up temp file
-                import os
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
+                await cl.Message(
+                    content=f"⚠️ **Some pages were skipped because they couldn't be read:**\n\n{page_notes}\n\nIf the details below are incomplete, answer **'no'** to enter them manually.",
+                    author="AppealAI Assistant"
+                ).send()
             
             # Store extracted data
             cl.user_session.set("collected_data", all_extracted_data)
             self.uploaded_image_data = all_extracted_data
             
             # Show extracted information for confirmation
-            await self.show_extracted_data_confirmation(all_extracted_data)
+            preview_paths = [path for path in await asyncio.gather(*preview_tasks) if path]
+            await self.show_extracted_data_confirmation(all_extracted_data, preview_paths)
             
         except Exception as e:
             await cl.Message(
@@ -368,8 +424,12 @@ Does this information look correct?
                 author="AppealAI Assistant"
             ).send()
             await self.start_manual_collection()
+        finally:
+            # Previews nobody will show (early return or error) must not outlive the request
+            for task in preview_tasks:
+                task.cancel()
     
-    async def show_extracted_data_confirmation(self, extracted_data: Dict[str, Any]):
+    async def show_extracted_data_confirmation(self, extracted_data: Dict[str, Any], preview_paths: Optional[List[str]] = None):
         """Show extracted data for user confirmation."""
         confirmation_text = f"""
 ✅ **Information Extracted from Your Housing Documents**
@@ -402,9 +462,16 @@ Here's what I found in your uploaded images:
 *Note: We'll still gather detailed information about your specific issue and desired resolution in the next steps.*
         """
         
+        # Show the user what was read alongside the upload itself
+        elements = [
+            cl.Image(name=f"document_preview_{i + 1}", path=path, display="inline")
+            for i, path in enumerate(preview_paths or [])
+        ]
+        
         await cl.Message(
             content=confirmation_text,
-            author="AppealAI Assistant"
+            author="AppealAI Assistant",
+            elements=elements
         ).send()
         
         cl.user_session.set("collection_step", "confirm_extracted_data")
@@ -1,16 +1,185 @@
+import io
+import bisect
 import os
 import re
 import cv2
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import pytesseract
-from typing import Dict, List, Optional, Tuple
-import chainlit as cl
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .field_extractor import DocumentSpec, HOUSING_DOCUMENT_SPEC, PARKING_TICKET_SPEC
+from .tesseract_engine import data_to_text, get_tesseract_engine
+from .timing import get_timing_registry
+
+# Bump whenever preprocessing or extraction changes so cached OCR results are invalidated
+OCR_PIPELINE_VERSION = "6"
+
+# Tesseract configuration for the main OCR pass
+TESSERACT_CONFIG = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,!?@#$%^&*()_+-=[]{}|;:\'\"<>/\\ '
+
+# Page segmentation for OCR of a single text line
+LINE_CONFIG = r'--oem 3 --psm 7'
+
+# Parking ticket fields read from the words that follow their label inside a text region:
+# field -> (label pattern, Tesseract config restricting the value's characters).
+# Labels are whole words, so "POLICE" is not a plate label nor "OVERDUE" an amount one.
+PARKING_REGION_FIELDS = {
+    "ticket_number": (
+        re.compile(r'\b(?:TICKET|CITATION|NOTICE|REF)\b'),
+        LINE_CONFIG + ' -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-'
+    ),
+    "amount": (
+        re.compile(r'\b(?:FINE|AMOUNT|DUE)\b'),
+        LINE_CONFIG + ' -c tessedit_char_whitelist=0123456789.$'
+    ),
+    "vehicle_info": (
+        re.compile(r'\b(?:LIC(?:ENSE)?|PLATE)\b'),
+        LINE_CONFIG + ' -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-'
+    ),
+}
+
+# Words between a label and its value, e.g. the "NO:" in "CITATION NO: 123"
+_LABEL_FILLER = re.compile(r'(?:NO\.?|NUMBER|#)?:?')
+
+# Above this share of the page, region OCR saves nothing over a full-page pass
+REGION_MAX_COVERAGE = 0.8
+
+# Longest side images are normalized to before OCR; phone photos are scaled down, tiny scans up
+OCR_MAX_DIMENSION = 2000
+OCR_MIN_DIMENSION = 1000
+
+# Estimated noise levels (standard deviation in gray levels) that select the denoising filter
+NOISE_SKIP_THRESHOLD = 3.0
+NOISE_MEDIAN_THRESHOLD = 8.0
+
+# OCR passes in increasing cost; the cascade stops at the first one that reads every
+# required field with at least this word confidence (0-100)
+OCR_CASCADE_PASSES = ("grayscale", "preprocessed", "heavy")
+CASCADE_MIN_CONFIDENCE = 60.0
+
+# Quality gate: images failing any of these are rejected before OCR.
+# Blur and text measures are taken on a copy downscaled to QUALITY_ANALYSIS_DIMENSION.
+# Resolution is judged on total pixels so narrow receipt-style tickets still pass; the
+# short-side floor only rejects strips too thin to hold a line of text.
+QUALITY_ANALYSIS_DIMENSION = 1000
+QUALITY_MIN_PIXELS = 150_000
+QUALITY_MIN_SHORT_SIDE = 120
+QUALITY_MIN_SHARPNESS = 60.0
+QUALITY_MIN_BRIGHTNESS = 40.0
+QUALITY_MAX_BRIGHTNESS = 245.0
+QUALITY_MIN_CONTRAST = 10.0
+QUALITY_MIN_EDGE_DENSITY = 0.004
+
+# Orientation correction: skew and text direction are estimated on a binarized copy
+# downscaled to ORIENTATION_ANALYSIS_DIMENSION. Skews under ORIENTATION_MIN_SKEW degrees
+# are not worth resampling the page for. Projection profiles decide the text direction
+# when rows are ORIENTATION_AXIS_RATIO times stronger than columns; otherwise Tesseract
+# OSD decides, if it is at least OSD_MIN_CONFIDENCE sure. ORIENTATION_BACKGROUND_KERNEL
+# (pixels at analysis size) is wider than any stroke, so closing with it leaves only the
+# paper brightness, which is divided out before thresholding. A cascade whose best
+# pass stays below ORIENTATION_RECHECK_CONFIDENCE also asks OSD (upside-down pages).
+ORIENTATION_ANALYSIS_DIMENSION = 800
+ORIENTATION_BACKGROUND_KERNEL = 25
+ORIENTATION_MIN_INK = 0.002
+ORIENTATION_MIN_SKEW = 0.5
+ORIENTATION_REFINE_OFFSETS = (-0.5, -0.25, 0.0, 0.25, 0.5)
+ORIENTATION_AXIS_RATIO = 2.0
+OSD_MIN_CONFIDENCE = 2.0
+ORIENTATION_RECHECK_CONFIDENCE = 40.0
+
+# Upload limits, enforced from the file size and image header before anything is decoded.
+# Decoded grayscale pages take one byte per pixel, so MAX_IMAGE_PIXELS bounds decode memory.
+MAX_UPLOAD_BYTES = int(os.getenv("APPEALAI_MAX_UPLOAD_MB", "20")) * 1024 * 1024
+MAX_IMAGE_PIXELS = int(os.getenv("APPEALAI_MAX_IMAGE_MEGAPIXELS", "100")) * 1000 * 1000
+# OpenCV reads its own decode limit on first use; keep it in line with ours as a second guard
+os.environ.setdefault("OPENCV_IO_MAX_IMAGE_PIXELS", str(MAX_IMAGE_PIXELS))
+
+# OpenCV flags that decode at 1/2, 1/4 or 1/8 scale (JPEGs are scaled while decoding)
+_REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Anything ImageProcessor can read: a file path, raw encoded bytes or an already decoded array
+ImageSource = Union[str, bytes, bytearray, memoryview, np.ndarray]
+
+# (index, extracted fields, error) for one item of a batch
+BatchItem = Tuple[int, Dict[str, str], Optional[Exception]]
+
+# Stage timings for this process; methods below are timed by name
+_timings = get_timing_registry()
+
+# Kernel for fast noise variance estimation (Immerkaer, 1996)
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+class ImageQualityError(ValueError):
+    """Raised when an upload is too poor to be worth running OCR on."""
+    
+    def __init__(self, issues: List[str]):
+        super().__init__("; ".join(issues))
+        self.issues = issues
+
+class ImageTooLargeError(ImageQualityError):
+    """Raised when an upload exceeds the file size or pixel limits."""
+
+class UnsupportedImageError(ImageQualityError):
+    """Raised when an upload's image header cannot be read, so its size cannot be checked."""
+
+def check_upload_limits(image: ImageSource) -> Tuple[int, int]:
+    """Enforce the upload limits without decoding the image.
+    
+    Returns the (width, height) from the image header. Raises ImageTooLargeError when a
+    limit is exceeded and UnsupportedImageError when PIL cannot read the header: such a
+    file could declare any size, and OpenCV would otherwise decode it unchecked.
+    """
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    
+    try:
+        size_bytes = os.path.getsize(image) if isinstance(image, str) else len(image)
+    except OSError:
+        raise ValueError("Could not read image file")
+    if size_bytes > MAX_UPLOAD_BYTES:
+        raise ImageTooLargeError([
+            f"The file is too large ({size_bytes / (1024 * 1024):.1f} MB). Please upload an image under "
+            f"{MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+        ])
+    
+    too_many_pixels = ImageTooLargeError([
+        f"The image has too many pixels. Please upload a photo under {MAX_IMAGE_PIXELS // 1000000} megapixels."
+    ])
+    try:
+        with warnings.catch_warnings():
+            # We apply our own pixel limit below
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            # Only the header is read here; pixel data is decoded lazily
+            with Image.open(image if isinstance(image, str) else io.BytesIO(image)) as header:
+                width, height = header.size
+    except Image.DecompressionBombError:
+        raise too_many_pixels
+    except Exception:
+        raise UnsupportedImageError([
+            "This file type is not supported. Please upload a JPEG, PNG, TIFF or PDF."
+        ])
+    
+    if width * height > MAX_IMAGE_PIXELS:
+        raise too_many_pixels
+    return width, height
 
 class ImageProcessor:
     """Handles image processing and OCR for parking tickets and housing documents."""
     
     def __init__(self):
+        # Details of the most recent preprocess_image call
+        self.last_preprocess_info: Dict[str, Any] = {}
+        # Details of the most recent load_grayscale call
+        self.last_decode_info: Dict[str, Any] = {}
+        
         # Configure tesseract path if needed (Windows)
         if os.name == 'nt':  # Windows
             # Try common installation paths
@@ -23,233 +192,887 @@ class ImageProcessor:
                 if os.path.exists(path):
                     pytesseract.pytesseract.tesseract_cmd = path
                     break
+        
+        # Shared per-process engine; stays loaded between calls when tesserocr is available
+        self.engine = get_tesseract_engine()
+        
+        # Shared per-process stage timings
+        self.timings = _timings
     
-    def preprocess_image(self, image_path: str) -> np.ndarray:
-        """Preprocess image for better OCR results."""
-        try:
-            # Read image
-            img = cv2.imread(image_path)
-            if img is None:
+    @_timings.timed("ocr.decode")
+    def load_grayscale(self, image: ImageSource) -> np.ndarray:
+        """Decode an image path, in-memory buffer or array into a grayscale array.
+        
+        Upload limits are checked from the header first, and images far larger than OCR
+        needs are decoded at a reduced scale. Raises ImageTooLargeError for uploads over
+        the limits, UnsupportedImageError when the header cannot be read, and ValueError
+        for unreadable ones.
+        """
+        if isinstance(image, np.ndarray):
+            self.last_decode_info = {"original_size": [image.shape[1], image.shape[0]], "reduction": 1}
+            return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        
+        size = check_upload_limits(image)
+        reduction = self.decode_reduction(size)
+        self.last_decode_info = {"original_size": list(size), "reduction": reduction}
+        
+        if isinstance(image, str):
+            gray = cv2.imread(image, _REDUCED_DECODE_FLAGS[reduction])
+        else:
+            buffer = np.frombuffer(image, dtype=np.uint8)
+            gray = cv2.imdecode(buffer, _REDUCED_DECODE_FLAGS[reduction]) if buffer.size else None
+        
+        if gray is None:
+            # OpenCV cannot decode every format PIL can, so give PIL a try
+            try:
+                source = image if isinstance(image, str) else io.BytesIO(image)
+                with Image.open(source) as pil_img:
+                    if reduction > 1:
+                        # JPEGs decode straight at the reduced scale
+                        pil_img.draft("L", (size[0] // reduction, size[1] // reduction))
+                    gray = np.asarray(pil_img.convert("L"))
+            except Exception:
                 raise ValueError("Could not read image file")
+        
+        return gray
+    
+    def decode_reduction(self, size: Optional[Tuple[int, int]]) -> int:
+        """Largest decode scale-down (1, 2, 4 or 8) that keeps the image at OCR resolution."""
+        reduction = 1
+        if size:
+            while reduction < 8 and max(size) / (reduction * 2) >= OCR_MAX_DIMENSION:
+                reduction *= 2
+        return reduction
+    
+    @_timings.timed("ocr.quality")
+    def assess_image_quality(self, gray: np.ndarray) -> Dict[str, Any]:
+        """Cheaply judge whether a grayscale image is worth running OCR on.
+        
+        Checks effective resolution, blur (variance of the Laplacian), exposure (mean
+        brightness and RMS contrast) and whether the image has text-like edge density
+        at all. Returns the measurements, a list of user-facing issues and whether the
+        image is acceptable.
+        """
+        height, width = gray.shape[:2]
+        issues = []
+        
+        if height * width < QUALITY_MIN_PIXELS or min(height, width) < QUALITY_MIN_SHORT_SIDE:
+            issues.append(f"The image resolution is too low ({width}x{height}). Please take the photo closer or at a higher resolution.")
+        
+        # All remaining measures run on a small copy so the gate stays within milliseconds
+        scale = min(QUALITY_ANALYSIS_DIMENSION / max(height, width), 1.0)
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+        
+        sharpness = float(cv2.Laplacian(small, cv2.CV_64F).var())
+        histogram = np.bincount(small.ravel(), minlength=256)
+        levels = np.arange(256)
+        brightness = float(np.dot(levels, histogram) / small.size)
+        # RMS contrast; percentile spreads miss sparse text on a plain background
+        contrast = float(np.sqrt(np.dot((levels - brightness) ** 2, histogram) / small.size))
+        edge_density = float(np.count_nonzero(cv2.Canny(small, 50, 150)) / small.size)
+        
+        if brightness < QUALITY_MIN_BRIGHTNESS:
+            issues.append("The photo is too dark. Please retake it in better lighting.")
+        elif brightness > QUALITY_MAX_BRIGHTNESS:
+            issues.append("The photo is overexposed. Please avoid glare or direct flash.")
+        elif contrast < QUALITY_MIN_CONTRAST:
+            issues.append("The photo has very little contrast. Please retake it in even lighting.")
+        
+        if edge_density < QUALITY_MIN_EDGE_DENSITY:
+            issues.append("No text could be found in the photo. Please make sure the document fills the frame.")
+        elif sharpness < QUALITY_MIN_SHARPNESS:
+            issues.append("The photo looks blurry. Please hold the camera steady and retake it.")
+        
+        return {
+            "acceptable": not issues,
+            "issues": issues,
+            "metrics": {
+                "width": width,
+                "height": height,
+                "sharpness": round(sharpness, 1),
+                "brightness": round(brightness, 1),
+                "contrast": round(contrast, 1),
+                "edge_density": round(edge_density, 4)
+            }
+        }
+    
+    def rotate_image(self, image: np.ndarray, angle: float, border_value: Optional[int] = None) -> np.ndarray:
+        """Rotate counter-clockwise by angle degrees, growing the canvas to keep the corners.
+        
+        Borders are filled with border_value, or by replicating the edge pixels if None.
+        """
+        if angle % 90 == 0:
+            # Quarter turns are exact transposes; no resampling needed
+            quarter_turns = {90: cv2.ROTATE_90_COUNTERCLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_CLOCKWISE}
+            turn = quarter_turns.get(int(angle) % 360)
+            return cv2.rotate(image, turn) if turn is not None else image
+        
+        height, width = image.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+        new_width, new_height = int(height * sin + width * cos), int(height * cos + width * sin)
+        matrix[0, 2] += new_width / 2 - width / 2
+        matrix[1, 2] += new_height / 2 - height / 2
+        
+        if border_value is None:
+            return cv2.warpAffine(image, matrix, (new_width, new_height), flags=cv2.INTER_LINEAR,
+                                  borderMode=cv2.BORDER_REPLICATE)
+        return cv2.warpAffine(image, matrix, (new_width, new_height), flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=border_value)
+    
+    def ink_mask(self, gray: np.ndarray) -> np.ndarray:
+        """Binarize a page to a mask of dark ink, tolerant of uneven lighting.
+        
+        The paper brightness is estimated by closing the page (which erases strokes thinner
+        than the kernel) and divided out, so a shaded half of a phone photo does not fall
+        below a single global threshold as a solid block of "ink".
+        """
+        # A rectangular kernel is separable, so the closing stays cheap at this size
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (ORIENTATION_BACKGROUND_KERNEL,) * 2)
+        background = cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
+        flattened = cv2.divide(gray, background, scale=255)
+        _, ink = cv2.threshold(flattened, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        return ink
+    
+    def estimate_skew(self, ink: np.ndarray) -> float:
+        """Estimate the skew of text lines, in degrees counter-clockwise, from an ink mask.
+        
+        Characters are merged into word blobs and the long axis of each blob's minimum
+        area rectangle votes, weighted by blob area. Sideways text gives the same skew as
+        upright text; the text direction is decided separately.
+        """
+        merged = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)), iterations=2)
+        contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        angles = []
+        weights = []
+        max_area = ink.shape[0] * ink.shape[1] / 4
+        for contour in contours:
+            rect = cv2.minAreaRect(contour)
+            rect_width, rect_height = rect[1]
+            long_side, short_side = max(rect_width, rect_height), min(rect_width, rect_height)
+            # Only elongated, word-sized blobs say anything about the line direction
+            if long_side < 10 or long_side < 2 * short_side or rect_width * rect_height > max_area:
+                continue
+            
+            # Take the long edge from the corner points; minAreaRect's own angle convention
+            # differs between OpenCV versions
+            corners = cv2.boxPoints(rect)
+            edge_a, edge_b = corners[1] - corners[0], corners[2] - corners[1]
+            dx, dy = edge_a if np.hypot(*edge_a) >= np.hypot(*edge_b) else edge_b
+            angle = (np.degrees(np.arctan2(dy, dx)) + 90) % 180 - 90
+            # Fold onto the nearest axis so horizontal and vertical text agree
+            if angle > 45:
+                angle -= 90
+            elif angle < -45:
+                angle += 90
+            angles.append(angle)
+            weights.append(rect_width * rect_height)
+        
+        if not angles:
+            return 0.0
+        
+        # Weighted median is robust to stray blobs such as logos or stamps
+        order = np.argsort(angles)
+        cumulative = np.cumsum(np.asarray(weights)[order])
+        return float(np.asarray(angles)[order][np.searchsorted(cumulative, cumulative[-1] / 2)])
+    
+    def projection_scores(self, ink: np.ndarray) -> Tuple[float, float]:
+        """Score how strongly text lines run along rows and along columns of an ink mask.
+        
+        Each score is the squared coefficient of variation of the projection profile over
+        the inked area: lines of text leave blank gaps between them in one profile only.
+        """
+        x, y, width, height = cv2.boundingRect(ink)
+        if width == 0 or height == 0:
+            return 0.0, 0.0
+        
+        inked = ink[y:y + height, x:x + width]
+        scores = []
+        for axis in (1, 0):
+            profile = np.count_nonzero(inked, axis=axis).astype(np.float64)
+            mean = profile.mean()
+            scores.append(float(profile.var() / (mean * mean)) if mean else 0.0)
+        return scores[0], scores[1]
+    
+    def detect_orientation(self, gray: np.ndarray) -> Optional[int]:
+        """Ask Tesseract OSD which clockwise quarter turn makes the page upright.
+        
+        Returns None when OSD is unavailable, finds too little text or is unsure.
+        """
+        try:
+            resized, _ = self.normalize_resolution(gray)
+            osd = self.engine.image_to_osd(resized)
+        except Exception as e:
+            print(f"Orientation detection error: {str(e)}")
+            return None
+        
+        if osd is None or osd["confidence"] < OSD_MIN_CONFIDENCE:
+            return None
+        return osd["rotate"] % 360
+    
+    @_timings.timed("ocr.orientation")
+    def correct_orientation(self, gray: np.ndarray) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Straighten a skewed or sideways page before OCR.
+        
+        The skew comes from minAreaRect estimation refined with projection profiles, and
+        the profiles also tell horizontal from vertical text lines. Both run on a small,
+        lighting-corrected ink mask in a few tens of milliseconds. Tesseract OSD is only
+        consulted when the text direction is ambiguous or sideways, and only OSD turns the
+        page a quarter turn. Returns the corrected image and what was done to it.
+        """
+        info: Dict[str, Any] = {"method": "none", "skew": 0.0, "rotation": 0}
+        
+        height, width = gray.shape[:2]
+        scale = min(ORIENTATION_ANALYSIS_DIMENSION / max(height, width), 1.0)
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+        ink = self.ink_mask(small)
+        if cv2.countNonZero(ink) < ORIENTATION_MIN_INK * ink.size:
+            return gray, info
+        
+        # Refine the blob estimate: the true skew gives the sharpest line profile
+        coarse_skew = self.estimate_skew(ink)
+        best_score, skew, row_score, column_score = -1.0, 0.0, 0.0, 0.0
+        for offset in ORIENTATION_REFINE_OFFSETS:
+            candidate = coarse_skew + offset
+            rows, columns = self.projection_scores(self.rotate_image(ink, candidate, border_value=0))
+            if max(rows, columns) > best_score:
+                best_score, skew, row_score, column_score = max(rows, columns), candidate, rows, columns
+        
+        info["method"] = "profile"
+        info["axis_ratio"] = round(row_score / column_score, 2) if column_score else None
+        if abs(skew) >= ORIENTATION_MIN_SKEW:
+            # The passes shrink oversized photos anyway; doing it first makes the rotation cheap
+            if max(height, width) > OCR_MAX_DIMENSION:
+                gray, resize_scale = self.normalize_resolution(gray)
+                info["scale"] = round(resize_scale, 3)
+            gray = self.rotate_image(gray, skew)
+            info["skew"] = round(skew, 2)
+        
+        if row_score >= ORIENTATION_AXIS_RATIO * column_score:
+            return gray, info
+        
+        # Sideways or unclear text; profiles cannot tell which way round it is, and a wrong
+        # quarter turn would ruin every pass, so the page is only turned when OSD agrees
+        rotation = self.detect_orientation(gray)
+        info["osd_checked"] = True
+        if rotation is not None:
+            info["method"] = "osd"
+        
+        if rotation:
+            gray = self.rotate_image(gray, -rotation)
+            info["rotation"] = rotation
+        return gray, info
+    
+    @_timings.timed("ocr.preprocess")
+    def preprocess_image(self, image: ImageSource) -> np.ndarray:
+        """Preprocess image for better OCR results.
+        
+        The steps taken are recorded in ``self.last_preprocess_info``.
+        """
+        self.last_preprocess_info = {}
+        
+        # Decode once; every later step works on this array
+        gray = self.load_grayscale(image)
+        try:
+            original_height, original_width = gray.shape[:2]
             
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            # Bring the image to an OCR-appropriate resolution before any filtering
+            gray, scale = self.normalize_resolution(gray)
             
-            # Apply denoising
-            denoised = cv2.fastNlMeansDenoising(gray)
+            # Only denoise as hard as the image needs
+            denoised, denoise, noise_sigma = self.denoise(gray)
             
-            # Enhance contrast
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced = clahe.apply(denoised)
+            # Enhance contrast; a filtered copy is ours to overwrite, the input is not
+            enhanced = self.enhance_contrast(denoised, in_place=denoised is not gray)
+            del denoised
             
-            # Apply threshold to get binary image
-            _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            # Apply threshold to get binary image, reusing the enhanced buffer
+            binary = self.binarize(enhanced, in_place=True)
             
+            self.last_preprocess_info = {
+                "original_size": [original_width, original_height],
+                "scale": round(scale, 3),
+                "noise_sigma": round(noise_sigma, 2),
+                "denoise": denoise
+            }
             return binary
             
         except Exception as e:
             print(f"Error preprocessing image: {str(e)}")
-            # Fallback to simple processing
-            img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-            return img
+            # Fallback to the plain grayscale image
+            self.last_preprocess_info = {"fallback": True}
+            return gray
     
-    def extract_text_from_image(self, image_path: str) -> str:
-        """Extract text from image using OCR."""
-        try:
-            # Preprocess the image
-            processed_img = self.preprocess_image(image_path)
-            
-            # Configure tesseract
-            custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,!?@#$%^&*()_+-=[]{}|;:\'\"<>/\\ '
+    @_timings.timed("ocr.denoise")
+    def denoise(self, gray: np.ndarray) -> Tuple[np.ndarray, str, float]:
+        """Pick a denoising filter from the estimated noise level and apply it.
+        
+        Returns the filtered image, the filter used and the noise estimate.
+        """
+        noise_sigma = self.estimate_noise(gray)
+        if noise_sigma < NOISE_SKIP_THRESHOLD:
+            return gray, "none", noise_sigma
+        if noise_sigma < NOISE_MEDIAN_THRESHOLD:
+            return cv2.medianBlur(gray, 3), "median", noise_sigma
+        return cv2.fastNlMeansDenoising(gray), "nlmeans", noise_sigma
+    
+    @_timings.timed("ocr.clahe")
+    def enhance_contrast(self, gray: np.ndarray, in_place: bool = False) -> np.ndarray:
+        """Equalize contrast locally (CLAHE) so faint print survives thresholding.
+        
+        With in_place, the input array is overwritten instead of allocating a new one.
+        """
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        return clahe.apply(gray, dst=gray) if in_place else clahe.apply(gray)
+    
+    @_timings.timed("ocr.threshold")
+    def binarize(self, gray: np.ndarray, in_place: bool = False) -> np.ndarray:
+        """Global Otsu threshold to black text on white.
+        
+        With in_place, the input array is overwritten instead of allocating a new one.
+        """
+        flags = cv2.THRESH_BINARY + cv2.THRESH_OTSU
+        _, binary = cv2.threshold(gray, 0, 255, flags, dst=gray) if in_place else cv2.threshold(gray, 0, 255, flags)
+        return binary
+    
+    @_timings.timed("ocr.resize")
+    def normalize_resolution(self, gray: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Scale a grayscale image so its longest side falls within the OCR range."""
+        longest_side = max(gray.shape[:2])
+        if longest_side > OCR_MAX_DIMENSION:
+            scale = OCR_MAX_DIMENSION / longest_side
+            interpolation = cv2.INTER_AREA
+        elif longest_side < OCR_MIN_DIMENSION:
+            scale = OCR_MIN_DIMENSION / longest_side
+            interpolation = cv2.INTER_CUBIC
+        else:
+            return gray, 1.0
+        
+        resized = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+        return resized, scale
+    
+    def estimate_noise(self, gray: np.ndarray) -> float:
+        """Estimate the noise standard deviation of a grayscale image."""
+        height, width = gray.shape[:2]
+        if height < 3 or width < 3:
+            return 0.0
+        
+        # The Laplacian-difference kernel cancels image structure and leaves mostly noise
+        response = cv2.filter2D(gray, cv2.CV_32F, _NOISE_KERNEL)
+        sigma = np.abs(response[1:-1, 1:-1]).sum()
+        return float(sigma * np.sqrt(0.5 * np.pi) / (6.0 * (width - 2) * (height - 2)))
+    
+    def detect_text_regions(self, binary: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Find candidate text lines in a binarized page as (x, y, width, height) boxes."""
+        height, width = binary.shape[:2]
+        
+        # Text is dark on a light background; smear characters horizontally into line blobs
+        inverted = cv2.bitwise_not(binary)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(width // 60, 9), 3))
+        merged = cv2.dilate(inverted, kernel)
+        contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        boxes = []
+        padding = 4
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            # Skip specks, and blobs too tall to be a line of text (borders, shadows, logos)
+            if h < 8 or w < 16 or h > height // 4:
+                continue
+            x0, y0 = max(x - padding, 0), max(y - padding, 0)
+            x1, y1 = min(x + w + padding, width), min(y + h + padding, height)
+            boxes.append((x0, y0, x1 - x0, y1 - y0))
+        
+        # Reading order: top to bottom, then left to right
+        boxes.sort(key=lambda box: (box[1], box[0]))
+        return boxes
+    
+    @_timings.timed("ocr.regions")
+    def extract_parking_regions(self, binary: np.ndarray) -> Optional[Dict[str, Any]]:
+        """OCR only the text regions of a binarized parking ticket.
+        
+        Returns the reconstructed text, the regions with their boxes and text, the words
+        with their confidences, and field values re-read with field-specific settings, or
+        None when the page is better served by a full-page pass.
+        """
+        regions = self.detect_text_regions(binary)
+        if not regions:
+            return None
+        
+        page_area = binary.shape[0] * binary.shape[1]
+        if sum(w * h for _, _, w, h in regions) > REGION_MAX_COVERAGE * page_area:
+            return None
+        
+        # Stack the regions into one compact strip so Tesseract runs once on far fewer pixels
+        gap = 12
+        strip_width = max(w for _, _, w, _ in regions) + 2 * gap
+        strip_height = sum(h for _, _, _, h in regions) + gap * (len(regions) + 1)
+        strip = np.full((strip_height, strip_width), 255, dtype=np.uint8)
+        offsets = []
+        top = gap
+        for x, y, w, h in regions:
+            strip[top:top + h, gap:gap + w] = binary[y:y + h, x:x + w]
+            offsets.append(top)
+            top += h + gap
+        
+        data = self.engine.image_to_data(strip, config=TESSERACT_CONFIG)
+        
+        # Assign each recognized word back to the region it was pasted from
+        region_words: List[List[Dict[str, Any]]] = [[] for _ in regions]
+        for i, word in enumerate(data["text"]):
+            word = word.strip()
+            if not word:
+                continue
+            center = data["top"][i] + data["height"][i] // 2
+            index = max(bisect.bisect_right(offsets, center) - 1, 0)
+            region_words[index].append({
+                "text": word,
+                "box": (data["left"][i], data["top"][i], data["width"][i], data["height"][i]),
+                "conf": data["conf"][i]
+            })
+        
+        region_results = []
+        refined_fields: Dict[str, str] = {}
+        refined_confidences: Dict[str, float] = {}
+        for box, words in zip(regions, region_words):
+            words.sort(key=lambda word: word["box"][0])
+            line_text = " ".join(word["text"] for word in words)
+            region = {"box": list(box), "text": line_text}
             
-            # Extract text
-            text = pytesseract.image_to_string(processed_img, config=custom_config)
+            # Find the first label word of each field on this line; a line may hold several,
+            # e.g. "TICKET NO 123 FINE $45"
+            label_indices: Dict[str, int] = {}
+            for i, word in enumerate(words):
+                upper_word = word["text"].upper()
+                for field, (label_pattern, _) in PARKING_REGION_FIELDS.items():
+                    if field in label_indices or field in refined_fields:
+                        continue
+                    if label_pattern.search(upper_word):
+                        label_indices[field] = i
+                        break
             
-            return text.strip()
+            # Re-read the words between each label and the next one with that field's settings
+            starts = sorted(label_indices.values())
+            for field, label_index in label_indices.items():
+                end = next((start for start in starts if start > label_index), len(words))
+                value_words = [word for word in words[label_index + 1:end]
+                               if not _LABEL_FILLER.fullmatch(word["text"].upper())]
+                if not value_words:
+                    continue
+                left = min(word["box"][0] for word in value_words)
+                top_edge = min(word["box"][1] for word in value_words)
+                right = max(word["box"][0] + word["box"][2] for word in value_words)
+                bottom = max(word["box"][1] + word["box"][3] for word in value_words)
+                value_crop = strip[max(top_edge - 4, 0):bottom + 4, max(left - 4, 0):right + 4]
+                # Word data rather than plain text, so the re-read value carries its own confidence
+                value_data = self.engine.image_to_data(value_crop, config=PARKING_REGION_FIELDS[field][1])
+                read_words = [(word.strip(), conf) for word, conf in zip(value_data["text"], value_data["conf"])
+                              if word.strip()]
+                if read_words:
+                    refined_fields[field] = " ".join(word for word, _ in read_words)
+                    refined_confidences[field] = min(conf for _, conf in read_words)
+                    region.setdefault("field", field)
             
-        except Exception as e:
-            print(f"OCR Error: {str(e)}")
-            # Fallback method
-            try:
-                img = Image.open(image_path)
-                text = pytesseract.image_to_string(img)
-                return text.strip()
-            except:
-                return "Error: Could not extract text from image. Please enter information manually."
-    
-    def analyze_parking_ticket(self, image_path: str) -> Dict[str, str]:
-        """Analyze parking ticket image and extract relevant information."""
-        text = self.extract_text_from_image(image_path)
-        
-        extracted_data = {
-            "ticket_number": "",
-            "issue_date": "",
-            "violation_description": "",
-            "location": "",
-            "vehicle_info": "",
-            "amount": ""
-        }
+            region_results.append(region)
         
-        # Extract ticket number (various patterns)
-        ticket_patterns = [
-            r'(?:TICKET|CITATION|NO\.?)\s*:?\s*([A-Z0-9\-]{6,15})',
-            r'(?:NOTICE|REF|ID)\s*:?\s*([A-Z0-9\-]{6,15})',
-            r'([A-Z0-9]{8,12})',  # Generic alphanumeric pattern
-        ]
-        
-        for pattern in ticket_patterns:
-            match = re.search(pattern, text.upper())
-            if match:
-                extracted_data["ticket_number"] = match.group(1)
-                break
+        return {
+            "text": "\n".join(region["text"] for region in region_results if region["text"]),
+            "regions": region_results,
+            "words": [(word["text"], word["conf"]) for words in region_words for word in words],
+            "refined_fields": refined_fields,
+            "refined_confidences": refined_confidences
+        }
+    
+    def apply_refined_parking_fields(self, fields: Dict[str, str], refined: Dict[str, str]) -> List[str]:
+        """Prefer values read with field-specific settings when they look valid.
         
-        # Extract dates (various formats)
-        date_patterns = [
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(\d{2,4}[/-]\d{1,2}[/-]\d{1,2})',
-            r'([A-Z][a-z]+ \d{1,2},? \d{4})',
-            r'(\d{1,2} [A-Z][a-z]+ \d{4})'
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                extracted_data["issue_date"] = match.group(1)
-                break
+        Returns the fields that were replaced.
+        """
+        applied = []
+        ticket_number = refined.get("ticket_number", "")
+        if re.fullmatch(r'[A-Z0-9\-]{6,15}', ticket_number):
+            fields["ticket_number"] = ticket_number
+            applied.append("ticket_number")
+        amount = refined.get("amount", "").lstrip("$")
+        if re.fullmatch(r'\d+(?:\.\d{1,2})?', amount):
+            fields["amount"] = f"${amount}"
+            applied.append("amount")
+        plate = refined.get("vehicle_info", "")
+        if re.fullmatch(r'[A-Z0-9\-]{3,8}', plate):
+            fields["vehicle_info"] = f"License Plate: {plate}"
+            applied.append("vehicle_info")
+        return applied
+    
+    @_timings.timed("ocr.pass_image")
+    def build_pass_image(self, pass_name: str, gray: np.ndarray) -> np.ndarray:
+        """Prepare the image for one OCR cascade pass, cheapest first."""
+        if pass_name == "grayscale":
+            # Resolution normalization only; Tesseract binarizes internally
+            resized, scale = self.normalize_resolution(gray)
+            self.last_preprocess_info = {"scale": round(scale, 3), "denoise": "none", "threshold": "tesseract"}
+            return resized
         
-        # Extract violation description
-        violation_keywords = [
-            "METER", "EXPIRED", "NO PARKING", "FIRE HYDRANT", "HANDICAP", 
-            "LOADING ZONE", "BUS ZONE", "OVERTIME", "BLOCKED", "DRIVEWAY"
-        ]
+        if pass_name == "preprocessed":
+            return self.preprocess_image(gray)
         
-        for line in text.upper().split('\n'):
-            for keyword in violation_keywords:
-                if keyword in line:
-                    extracted_data["violation_description"] = line.strip()
-                    break
-            if extracted_data["violation_description"]:
-                break
+        if pass_name == "heavy":
+            # Strong denoising and a local threshold for uneven lighting
+            resized, scale = self.normalize_resolution(gray)
+            page = cv2.fastNlMeansDenoising(resized, h=15)
+            # The denoised copy is reused in place for the remaining steps
+            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+            clahe.apply(page, dst=page)
+            binary = cv2.adaptiveThreshold(page, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15,
+                                           dst=page)
+            self.last_preprocess_info = {"scale": round(scale, 3), "denoise": "nlmeans", "threshold": "adaptive"}
+            return binary
         
-        # Extract location/address
-        address_patterns = [
-            r'(\d+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:ST|AVE|BLVD|RD|DR|LN|CT|PL))',
-            r'([A-Z][A-Z\s]+(?:STREET|AVENUE|BOULEVARD|ROAD|DRIVE|LANE))',
-        ]
+        raise ValueError(f"Unknown OCR pass: {pass_name}")
+    
+    def field_confidence(self, value: str, word_confidences: Dict[str, float]) -> float:
+        """Confidence of a field value: the weakest of the OCR words it was built from."""
+        tokens = [token for token in re.split(r'[\s:,$]+', value.upper()) if token]
+        confidences = [word_confidences[token] for token in tokens if token in word_confidences]
+        return min(confidences) if confidences else 0.0
+    
+    @_timings.timed("ocr.pass")
+    def run_ocr_pass(self, page: np.ndarray, spec: DocumentSpec, use_regions: bool) -> Dict[str, Any]:
+        """OCR one prepared page and score the fields it yields."""
+        region_result = self.extract_parking_regions(page) if use_regions else None
+        if region_result and region_result["text"]:
+            text = region_result["text"]
+            words = region_result["words"]
+            regions = region_result["regions"]
+        else:
+            data = self.engine.image_to_data(page, config=TESSERACT_CONFIG)
+            text = data_to_text(data)
+            words = [(word.strip(), conf) for word, conf in zip(data["text"], data["conf"]) if word.strip()]
+            regions = []
         
-        for pattern in address_patterns:
-            match = re.search(pattern, text)
-            if match:
-                extracted_data["location"] = match.group(1)
-                break
+        fields = spec.extract(text)
+        # Re-read values rarely match the strip's tokens, so they are scored by their own read
+        refined_confidences: Dict[str, float] = {}
+        if region_result:
+            for field in self.apply_refined_parking_fields(fields, region_result["refined_fields"]):
+                refined_confidences[field] = region_result["refined_confidences"][field]
         
-        # Extract vehicle information
-        license_pattern = r'(?:LIC|LICENSE|PLATE)\s*:?\s*([A-Z0-9\-]{3,8})'
-        license_match = re.search(license_pattern, text.upper())
-        if license_match:
-            extracted_data["vehicle_info"] = f"License Plate: {license_match.group(1)}"
-        
-        # Extract fine amount
-        amount_patterns = [
-            r'\$(\d+\.?\d*)',
-            r'FINE\s*:?\s*\$?(\d+\.?\d*)',
-            r'AMOUNT\s*:?\s*\$?(\d+\.?\d*)'
-        ]
-        
-        for pattern in amount_patterns:
-            match = re.search(pattern, text.upper())
-            if match:
-                extracted_data["amount"] = f"${match.group(1)}"
-                break
+        # Map each word token to its best confidence so field values can be scored
+        word_confidences: Dict[str, float] = {}
+        for word, conf in words:
+            for token in re.split(r'[\s:,$]+', word.upper()):
+                if token and conf > word_confidences.get(token, -1.0):
+                    word_confidences[token] = conf
         
-        return extracted_data
-    
-    def analyze_housing_document(self, image_path: str) -> Dict[str, str]:
-        """Analyze housing document image and extract relevant information."""
-        text = self.extract_text_from_image(image_path)
-        
-        extracted_data = {
-            "property_address": "",
-            "landlord_info": "",
-            "issue_type": "",
-            "dates": "",
-            "rent_amount": "",
-            "lease_info": ""
+        required_confidences = {
+            field: refined_confidences[field] if field in refined_confidences
+            else self.field_confidence(fields[field], word_confidences)
+            for field in spec.required if fields[field]
         }
+        valid_confidences = [conf for _, conf in words if conf >= 0]
+        mean_confidence = sum(valid_confidences) / len(valid_confidences) if valid_confidences else 0.0
         
-        # Extract property address
-        address_patterns = [
-            r'(?:PROPERTY|ADDRESS|UNIT|APT)\s*:?\s*(\d+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:ST|AVE|BLVD|RD|DR|LN|CT|PL))',
-            r'(\d+\s+[A-Z][A-Z\s]+(?:STREET|AVENUE|BOULEVARD|ROAD|DRIVE|LANE))',
-        ]
+        return {
+            "text": text,
+            "fields": fields,
+            "regions": regions,
+            "confidence": round(mean_confidence, 1),
+            "required_found": len(required_confidences),
+            "complete": len(required_confidences) == len(spec.required) and
+                        all(conf >= CASCADE_MIN_CONFIDENCE for conf in required_confidences.values()),
+            "preprocessing": dict(self.last_preprocess_info)
+        }
+    
+    def run_cascade_passes(self, gray: np.ndarray, spec: DocumentSpec,
+                           use_regions: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Run the OCR passes in cost order, stopping at the first complete one.
         
-        for pattern in address_patterns:
-            match = re.search(pattern, text)
-            if match:
-                extracted_data["property_address"] = match.group(1)
+        Returns the results of the passes that ran and a summary of every attempt.
+        """
+        results = []
+        attempts = []
+        for pass_name in OCR_CASCADE_PASSES:
+            try:
+                page = self.build_pass_image(pass_name, gray)
+                # Region OCR needs a binarized page
+                result = self.run_ocr_pass(page, spec, use_regions and pass_name != "grayscale")
+            except Exception as e:
+                print(f"OCR Error ({pass_name} pass): {str(e)}")
+                attempts.append({"pass": pass_name, "error": str(e)})
+                continue
+            
+            result["pass"] = pass_name
+            results.append(result)
+            attempts.append({"pass": pass_name, "confidence": result["confidence"],
+                             "required_found": result["required_found"], "complete": result["complete"]})
+            if result["complete"]:
                 break
+        return results, attempts
+    
+    @_timings.timed("ocr.cascade")
+    def run_ocr_cascade(self, image: ImageSource, spec: DocumentSpec, use_regions: bool = False) -> Dict[str, Any]:
+        """Run cost-ordered OCR passes until the required fields are read confidently.
         
-        # Extract landlord/management company information
-        landlord_patterns = [
-            r'(?:LANDLORD|OWNER|MANAGEMENT|COMPANY)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            r'(?:MANAGED BY|PROPERTY MANAGER)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-        ]
+        Clean photos finish on the cheap grayscale pass; only hard images reach the heavy
+        one. Pages are straightened first, and when every pass reads poorly Tesseract OSD
+        gets a chance to turn the page (e.g. upside down) before the passes are retried.
+        When no pass is conclusive, the best-scoring pass is used and any fields it missed
+        are filled from the other passes.
+        """
+        self.last_preprocess_info = {}
+        try:
+            gray = self.load_grayscale(image)
+        except ImageQualityError as e:
+            # Over the upload limits, or a format whose size could not be checked
+            if isinstance(e, ImageTooLargeError):
+                text = "Error: Image too large for OCR."
+            else:
+                text = "Error: Unsupported image format."
+            return {"text": text, "fields": spec.extract(text), "regions": [], "cascade": [], "preprocessing": {},
+                    "quality": {"acceptable": False, "issues": e.issues, "metrics": {}}}
+        except ValueError as e:
+            print(f"OCR Error: {str(e)}")
+            text = "Error: Could not extract text from image. Please enter information manually."
+            return {"text": text, "fields": spec.extract(text), "regions": [], "cascade": [], "preprocessing": {}}
         
-        for pattern in landlord_patterns:
-            match = re.search(pattern, text)
-            if match:
-                extracted_data["landlord_info"] = match.group(1)
-                break
+        # Reject hopeless images before spending any OCR time on them
+        quality = self.assess_image_quality(gray)
+        if not quality["acceptable"]:
+            text = "Error: Image quality too low for OCR."
+            return {"text": text, "fields": spec.extract(text), "regions": [], "cascade": [], "preprocessing": {},
+                    "quality": quality}
         
-        # Extract rent amount
-        rent_patterns = [
-            r'(?:RENT|MONTHLY)\s*:?\s*\$?(\d+\.?\d*)',
-            r'\$(\d{3,4}\.?\d*)(?:\s*(?:PER MONTH|MONTHLY|/MONTH))?'
-        ]
+        # Shrink oversized photos once, so the full-size decode is released and no later
+        # stage copies it
+        decode_info = dict(self.last_decode_info)
+        if max(gray.shape[:2]) > OCR_MAX_DIMENSION:
+            gray, scale = self.normalize_resolution(gray)
+            decode_info["scale"] = round(scale, 3)
+        decode_info["size"] = [gray.shape[1], gray.shape[0]]
         
-        for pattern in rent_patterns:
-            match = re.search(pattern, text.upper())
-            if match:
-                extracted_data["rent_amount"] = f"${match.group(1)}"
-                break
+        # Straighten skewed and sideways photos so the first pass can read them
+        try:
+            gray, orientation = self.correct_orientation(gray)
+        except Exception as e:
+            print(f"Orientation correction error: {str(e)}")
+            orientation = {"method": "none", "skew": 0.0, "rotation": 0, "error": str(e)}
         
-        # Identify document type/issue
-        issue_keywords = {
-            "LEASE": ["LEASE", "RENTAL AGREEMENT", "TENANCY"],
-            "MAINTENANCE": ["REPAIR", "MAINTENANCE", "BROKEN", "LEAK", "PEST"],
-            "EVICTION": ["EVICTION", "NOTICE TO QUIT", "TERMINATION"],
-            "DEPOSIT": ["DEPOSIT", "SECURITY", "REFUND"],
-            "NOTICE": ["NOTICE", "WARNING", "VIOLATION"]
-        }
+        results, attempts = self.run_cascade_passes(gray, spec, use_regions)
         
-        for issue_type, keywords in issue_keywords.items():
-            for keyword in keywords:
-                if keyword in text.upper():
-                    extracted_data["issue_type"] = issue_type
-                    break
-            if extracted_data["issue_type"]:
-                break
+        # Every pass reading poorly is the telltale sign of an upside-down page
+        conclusive = any(result["complete"] or result["confidence"] >= ORIENTATION_RECHECK_CONFIDENCE
+                         for result in results)
+        if not conclusive and not orientation.get("osd_checked"):
+            rotation = self.detect_orientation(gray)
+            orientation["osd_checked"] = True
+            if rotation:
+                gray = self.rotate_image(gray, -rotation)
+                orientation["rotation"] = (orientation["rotation"] + rotation) % 360
+                orientation["method"] = "osd"
+                # Results read the wrong way round would only pollute the merge below
+                results, retry_attempts = self.run_cascade_passes(gray, spec, use_regions)
+                attempts += [dict(attempt, rotation=rotation) for attempt in retry_attempts]
         
-        # Extract dates
-        date_pattern = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-        dates = re.findall(date_pattern, text)
-        if dates:
-            extracted_data["dates"] = ", ".join(dates[:3])  # First 3 dates found
+        if not results:
+            text = "Error: Could not extract text from image. Please enter information manually."
+            return {"text": text, "fields": spec.extract(text), "regions": [], "cascade": attempts, "preprocessing": {},
+                    "orientation": orientation, "decode": decode_info}
         
-        return extracted_data
+        best = max(results, key=lambda result: (result["required_found"], result["confidence"]))
+        fields = dict(best["fields"])
+        for result in results:
+            for field, value in result["fields"].items():
+                if value and not fields.get(field):
+                    fields[field] = value
+        
+        return {
+            "text": best["text"],
+            "fields": fields,
+            "regions": best["regions"],
+            "cascade": attempts,
+            "preprocessing": best["preprocessing"],
+            "orientation": orientation,
+            "decode": decode_info,
+            "quality": quality
+        }
     
-    def create_image_preview(self, image_path: str, max_size: Tuple[int, int] = (400, 300)) -> str:
-        """Create a resized preview of the uploaded image."""
+    def ocr_parking_ticket(self, image: ImageSource) -> Dict[str, Any]:
+        """Run OCR on a parking ticket image, returning the raw text and extracted fields.
+        
+        On binarized passes, text regions are OCR'd individually when the layout allows it;
+        otherwise the whole page is read.
+        """
+        return self.run_ocr_cascade(image, PARKING_TICKET_SPEC, use_regions=True)
+    
+    def ocr_housing_document(self, image: ImageSource) -> Dict[str, Any]:
+        """Run OCR on a housing document image, returning the raw text and extracted fields."""
+        return self.run_ocr_cascade(image, HOUSING_DOCUMENT_SPEC)
+    
+    @_timings.timed("ocr.analyze_parking_ticket")
+    def analyze_parking_ticket(self, image: ImageSource) -> Dict[str, str]:
+        """Analyze parking ticket image and extract relevant information."""
+        return self.ocr_parking_ticket(image)["fields"]
+    
+    @_timings.timed("ocr.analyze_housing_document")
+    def analyze_housing_document(self, image: ImageSource) -> Dict[str, str]:
+        """Analyze housing document image and extract relevant information."""
+        return self.ocr_housing_document(image)["fields"]
+    
+    @_timings.timed("ocr.analyze_parking_text")
+    def analyze_parking_text(self, text: str) -> Dict[str, str]:
+        """Extract parking ticket fields from OCR text."""
+        return PARKING_TICKET_SPEC.extract(text)
+    
+    @_timings.timed("ocr.analyze_housing_text")
+    def analyze_housing_text(self, text: str) -> Dict[str, str]:
+        """Extract housing document fields from OCR text."""
+        return HOUSING_DOCUMENT_SPEC.extract(text)
+    
+    def ocr_batch(self, document_type: str, images: Iterable[ImageSource], max_workers: Optional[int] = None,
+                  executor: Optional[Executor] = None) -> Iterator[Tuple[int, Dict[str, Any], Optional[Exception]]]:
+        """OCR many images across CPU cores, yielding (index, OCR result, error) as each finishes.
+        
+        Each worker process builds its ImageProcessor and OCR engine once and reuses them
+        for every image it is given. At most two images per worker are in flight, so large
+        or lazily produced batches are not all held in memory. Pass an executor started
+        with init_ocr_worker to reuse its workers across batches; otherwise a pool is
+        started for this batch. A failed image yields an empty result and its exception
+        instead of ending the batch; if the images iterable itself fails, that is reported
+        as the next item and the batch stops.
+        """
+        if document_type not in ("parking", "housing"):
+            raise ValueError(f"Unknown document type: {document_type}")
+        
+        workers = max_workers or os.cpu_count() or 1
+        if executor is None and workers == 1:
+            index = 0
+            iterator = iter(images)
+            while True:
+                try:
+                    image = next(iterator, None)
+                except Exception as e:
+                    yield index, {}, e
+                    return
+                if image is None:
+                    return
+                try:
+                    result = ocr_document(document_type, image)
+                    # Already recorded in this process
+                    result.pop("timings", None)
+                    yield index, result, None
+                except Exception as e:
+                    print(f"Error processing image {index}: {str(e)}")
+                    yield index, {}, e
+                index += 1
+        
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_ocr_worker) as pool:
+                yield from self.ocr_batch(document_type, images, workers, pool)
+            return
+        
+        pending = {}
+        image_iterator = enumerate(images)
+        next_index = 0
+        exhausted = False
         try:
-            with Image.open(image_path) as img:
-                # Calculate new size maintaining aspect ratio
-                img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            while pending or not exhausted:
+                # Keep the pool fed without materializing the whole batch
+                while not exhausted and len(pending) < workers * 2:
+                    try:
+                        index, image = next(image_iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    except Exception as e:
+                        # The images could not be produced (e.g. a corrupt upload)
+                        yield next_index, {}, e
+                        exhausted = True
+                        break
+                    next_index = index + 1
+                    try:
+                        pending[executor.submit(ocr_document, document_type, image)] = index
+                    except Exception as e:
+                        # The pool is broken or shut down
+                        yield index, {}, e
                 
-                # Save preview
-                preview_path = image_path.replace('.', '_preview.')
-                img.save(preview_path, quality=85, optimize=True)
-                
-                return preview_path
-        except Exception as e:
-            print(f"Error creating preview: {str(e)}")
-            return image_path
\ No newline at end of file
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # A single failed image should not discard the rest of the batch
+                        print(f"Error processing image {index}: {str(e)}")
+                        yield index, {}, e
+                        continue
+                    self.timings.merge(result.pop("timings", {}))
+                    yield index, result, None
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def analyze_batch(self, document_type: str, images: Iterable[ImageSource], max_workers: Optional[int] = None,
+                      executor: Optional[Executor] = None) -> Iterator[BatchItem]:
+        """Extract fields from many images, yielding (index, fields, error) as each finishes.
+        
+        Images the quality gate rejects yield an ImageQualityError with the issues found.
+        """
+        for index, result, error in self.ocr_batch(document_type, images, max_workers, executor):
+            quality = result.get("quality")
+            if error is None and quality and not quality["acceptable"]:
+                error = ImageQualityError(quality["issues"])
+            if error is not None:
+                yield index, {}, error
+            else:
+                yield index, result["fields"], None
+    
+    def analyze_parking_batch(self, images: Iterable[ImageSource], max_workers: Optional[int] = None,
+                              executor: Optional[Executor] = None) -> Iterator[BatchItem]:
+        """Analyze many parking ticket images, yielding (index, fields, error) as each finishes."""
+        return self.analyze_batch("parking", images, max_workers, executor)
+    
+    def analyze_housing_batch(self, images: Iterable[ImageSource], max_workers: Optional[int] = None,
+                              executor: Optional[Executor] = None) -> Iterator[BatchItem]:
+        """Analyze many housing document images, yielding (index, fields, error) as each finishes."""
+        return self.analyze_batch("housing", images, max_workers, executor)
+
+
+# One ImageProcessor per worker process, created on first use
+_worker_processor: Optional[ImageProcessor] = None
+
+
+def get_worker_processor() -> ImageProcessor:
+    """Return the ImageProcessor owned by the current process."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = ImageProcessor()
+    return _worker_processor
+
+
+def init_ocr_worker():
+    """Load the OCR engine when a worker starts so no request pays for it.
+    
+    Only tesserocr keeps an engine loaded; with pytesseract alone there is nothing to
+    warm and every call still starts a tesseract process.
+    """
+    get_worker_processor().engine.warm_up()
+
+
+def ocr_document(document_type: str, image: ImageSource) -> Dict[str, Any]:
+    """Worker entry point: OCR one parking ticket or housing document.
+    
+    The stage timings of the call are returned under "timings" so the calling process
+    can fold them into its own histograms.
+    """
+    processor = get_worker_processor()
+    with processor.timings.capture() as timings:
+        if document_type == "parking":
+            result = processor.ocr_parking_ticket(image)
+        elif document_type == "housing":
+            result = processor.ocr_housing_document(image)
+        else:
+            raise ValueError(f"Unknown document type: {document_type}")
+    result["timings"] = timings
+    return result
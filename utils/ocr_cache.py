@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .image_processor import OCR_PIPELINE_VERSION, TESSERACT_CONFIG
+
+
+class OCRCache:
+    """Content-addressed OCR result cache with an in-memory LRU in front of a disk store."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_memory_entries: Optional[int] = None,
+                 max_disk_bytes: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.cache_dir = cache_dir or os.getenv("APPEALAI_OCR_CACHE_DIR", os.path.join("cache", "ocr"))
+        self.max_memory_entries = max_memory_entries or int(os.getenv("APPEALAI_OCR_CACHE_ENTRIES", "256"))
+        self.max_disk_bytes = max_disk_bytes or int(os.getenv("APPEALAI_OCR_CACHE_MAX_MB", "100")) * 1024 * 1024
+        self.ttl_seconds = ttl_seconds or int(os.getenv("APPEALAI_OCR_CACHE_TTL", str(7 * 24 * 3600)))
+        # Prune the disk store after this many writes rather than on every write
+        self.prune_interval = 32
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content: bytes, document_type: str) -> str:
+        """Build a cache key from the upload bytes and the current OCR configuration."""
+        digest = hashlib.sha256()
+        digest.update(f"{document_type}\0{OCR_PIPELINE_VERSION}\0{TESSERACT_CONFIG}\0".encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a key, or None on a miss or expired entry."""
+        now = time.time()
+
+        # Memory tier
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry["created_at"] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    return entry["result"]
+                del self._memory[key]
+
+        # Disk tier
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if now - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove_file(path)
+            return None
+
+        self._remember(key, entry)
+        return entry["result"]
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result in both tiers."""
+        entry = {"created_at": time.time(), "result": result}
+        self._remember(key, entry)
+
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing OCR cache entry: {str(e)}")
+            return
+
+        with self._lock:
+            self._writes_since_prune += 1
+            should_prune = self._writes_since_prune >= self.prune_interval
+            if should_prune:
+                self._writes_since_prune = 0
+        if should_prune:
+            self.prune()
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        """Insert an entry into the memory tier, evicting the least recently used."""
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def prune(self):
+        """Evict expired disk entries, then the oldest ones until under the size quota."""
+        now = time.time()
+        files = []
+        total_size = 0
+
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    self._remove_file(path)
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        # Oldest entries go first
+        files.sort()
+        for _, size, path in files:
+            if total_size <= self.max_disk_bytes:
+                break
+            self._remove_file(path)
+            total_size -= size
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                self._remove_file(os.path.join(root, name))
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_shared_cache: Optional[OCRCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRCache:
+    """Return the process-wide OCR cache."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = OCRCache()
+        return _shared_cache
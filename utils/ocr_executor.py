@@ -0,0 +1,176 @@
+import os
+import sys
+import atexit
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Set
+
+from .document_pages import Page, load_page
+from .field_extractor import DOCUMENT_SPECS
+from .image_processor import BatchItem, ImageQualityError, check_upload_limits, init_ocr_worker, ocr_document
+from .ocr_cache import OCRCache, get_ocr_cache
+from .timing import get_timing_registry
+
+# Stage timings for this process
+_timings = get_timing_registry()
+
+class OCRExecutor:
+    """Runs OCR jobs in a dedicated process pool so the event loop stays responsive."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_tasks_per_child: Optional[int] = None,
+                 cache: Optional[OCRCache] = None):
+        # Pool size and worker recycling can be tuned through the environment
+        self.max_workers = max_workers or int(
+            os.getenv("APPEALAI_OCR_WORKERS", str(min(4, os.cpu_count() or 1)))
+        )
+        self.max_tasks_per_child = max_tasks_per_child or int(
+            os.getenv("APPEALAI_OCR_MAX_TASKS_PER_CHILD", "50")
+        )
+        # Optional result cache keyed by upload content
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("OCR executor has been shut down")
+            if self._executor is None:
+                kwargs: Dict[str, Any] = {"max_workers": self.max_workers, "initializer": init_ocr_worker}
+                # Worker recycling is only available on Python 3.11+
+                if sys.version_info >= (3, 11) and self.max_tasks_per_child > 0:
+                    kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+                self._executor = ProcessPoolExecutor(**kwargs)
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor):
+        """Drop a pool whose worker died so the next job starts a fresh one."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable function in the pool and await its result."""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise
+
+    @_timings.timed("executor.analyze_page")
+    async def analyze_page(self, document_type: str, page: Page) -> Dict[str, str]:
+        """Analyze one rendered document page: its text layer when it has one, OCR otherwise."""
+        if page.get("text") is not None:
+            return DOCUMENT_SPECS[document_type].extract(page["text"])
+        return await self._analyze(document_type, page["content"])
+
+    async def analyze_pages(self, document_type: str, pages: Iterable[Page],
+                            on_page: Optional[Callable[[int, Page], Any]] = None) -> AsyncIterator[BatchItem]:
+        """Analyze pages pulled lazily from an iterable, yielding results as they finish.
+
+        Pages are pulled only as capacity frees up, with at most two per worker in flight,
+        and each is rendered inside its own task, so memory stays flat however long the
+        document is. on_page is called on the event loop with each page once it is
+        rendered. A failed page yields empty fields and the exception instead of aborting
+        the others; if the iterable itself fails, that is reported as the next page and
+        no further pages are pulled.
+        """
+        async def analyze_one(index: int, page: Page) -> BatchItem:
+            try:
+                if "load" in page:
+                    page = await asyncio.to_thread(load_page, page)
+                if on_page is not None:
+                    on_page(index, page)
+                return index, await self.analyze_page(document_type, page), None
+            except Exception as e:
+                # A single unreadable page should not discard the others
+                print(f"Error processing page {index}: {str(e)}")
+                return index, {}, e
+
+        iterator = iter(pages)
+        in_flight: Set[asyncio.Task] = set()
+        next_index = 0
+        exhausted = False
+        try:
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < self.max_workers * 2:
+                    try:
+                        page = await asyncio.to_thread(next, iterator, None)
+                    except Exception as e:
+                        # The upload could not be split into pages (e.g. a corrupt file)
+                        print(f"Error reading page {next_index}: {str(e)}")
+                        yield next_index, {}, e
+                        exhausted = True
+                        break
+                    if page is None:
+                        exhausted = True
+                        break
+                    in_flight.add(asyncio.create_task(analyze_one(next_index, page)))
+                    next_index += 1
+
+                if not in_flight:
+                    break
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _analyze(self, document_type: str, content: bytes) -> Dict[str, str]:
+        """Return cached fields for the upload when available, otherwise run OCR and cache the result."""
+        # Refuse oversized uploads before hashing them or copying them to a worker
+        check_upload_limits(content)
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(content, document_type)
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                # Hand out a copy since callers keep editing the collected data
+                return dict(cached["fields"])
+
+        result = await self.run(ocr_document, document_type, content)
+        # Fold the worker's stage timings into this process's histograms
+        _timings.merge(result.pop("timings", {}))
+
+        # The worker's quality gate rejected the image before OCR
+        quality = result.get("quality")
+        if quality and not quality["acceptable"]:
+            raise ImageQualityError(quality["issues"])
+
+        # Failed OCR runs are not cached so a retry gets a fresh attempt
+        if key is not None and not result["text"].startswith("Error:"):
+            await asyncio.to_thread(self.cache.put, key, result)
+
+        return dict(result["fields"])
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs, cancel queued ones and wait for running ones."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_shared_executor: Optional[OCRExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def get_ocr_executor() -> OCRExecutor:
+    """Return the process-wide OCR executor shared by all handlers."""
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            cache = get_ocr_cache() if os.getenv("APPEALAI_OCR_CACHE", "1") != "0" else None
+            _shared_executor = OCRExecutor(cache=cache)
+            atexit.register(_shared_executor.shutdown)
+        return _shared_executor
@@ -0,0 +1,123 @@
+import os
+import re
+import time
+import atexit
+import threading
+from typing import List, Optional, Tuple
+
+# Files this app writes to the output directory: <type>_dispute_<timestamp>_<id>.<format>,
+# optionally with the .<pid>.tmp suffix they are written through
+GENERATED_DOCUMENT = re.compile(r'\w+_dispute_\w+\.(?:docx|pdf|txt)(\.\d+\.tmp)?')
+
+
+class OutputJanitor:
+    """Keeps generated documents on disk bounded by age and total size.
+
+    Runs a sweep on a daemon thread every interval: documents older than the age limit
+    go first, then the oldest ones until the directory is under its size quota. Only files
+    named like generated documents are touched, so other files in the directory are safe.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, max_age_seconds: Optional[int] = None,
+                 max_bytes: Optional[int] = None, interval_seconds: Optional[int] = None):
+        self.output_dir = output_dir or os.getenv("APPEALAI_OUTPUT_DIR", "output")
+        self.max_age_seconds = max_age_seconds or int(float(os.getenv("APPEALAI_OUTPUT_MAX_AGE_HOURS", "24")) * 3600)
+        self.max_bytes = max_bytes or int(os.getenv("APPEALAI_OUTPUT_MAX_MB", "500")) * 1024 * 1024
+        self.interval_seconds = interval_seconds or int(os.getenv("APPEALAI_OUTPUT_SWEEP_INTERVAL", "600"))
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start sweeping in the background; does nothing if already running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="output-janitor", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """Stop the background sweeps."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and wait:
+            thread.join()
+
+    def _run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error cleaning up output files: {str(e)}")
+            if self._stop.wait(self.interval_seconds):
+                return
+
+    def sweep(self) -> int:
+        """Run one cleanup pass and return the number of files removed."""
+        return self.prune_output()
+
+    def prune_output(self) -> int:
+        """Evict expired documents, then the oldest ones until under the size quota."""
+        now = time.time()
+        removed = 0
+        files: List[Tuple[float, int, str]] = []
+        total_size = 0
+
+        try:
+            entries = list(os.scandir(self.output_dir))
+        except OSError:
+            # Nothing has been saved yet
+            return 0
+
+        for entry in entries:
+            match = GENERATED_DOCUMENT.fullmatch(entry.name)
+            if match is None:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                removed += self._remove_file(entry.path)
+                continue
+            if match.group(1):
+                # A document still being written; removed above only once a crash has orphaned it
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+        # Oldest documents go first
+        files.sort()
+        for _, size, path in files:
+            if total_size <= self.max_bytes:
+                break
+            removed += self._remove_file(path)
+            total_size -= size
+        return removed
+
+    @staticmethod
+    def _remove_file(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+
+_shared_janitor: Optional[OutputJanitor] = None
+_shared_lock = threading.Lock()
+
+
+def get_output_janitor() -> OutputJanitor:
+    """Return the process-wide output janitor."""
+    global _shared_janitor
+    with _shared_lock:
+        if _shared_janitor is None:
+            _shared_janitor = OutputJanitor()
+            atexit.register(_shared_janitor.stop, False)
+        return _shared_janitor
@@ -1,7 +1,11 @@
+import asyncio
 import chainlit as cl
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from .image_processor import ImageProcessor
+from .document_pages import first_page
+from .image_processor import ImageQualityError
+from .ocr_executor import get_ocr_executor
+from .preview_service import get_preview_service
 
 class ParkingTicketHandler:
     """Handler for collecting parking ticket dispute information."""
@@ -18,7 +22,8 @@ class ParkingTicketHandler:
             "personal_info"
         ]
         self.current_field = 0
-        self.image_processor = ImageProcessor()
+        self.ocr_executor = get_ocr_executor()
+        self.preview_service = get_preview_service()
         self.uploaded_image_data = None
         
     async def start_collection(self):
@@ -246,6 +251,7 @@ Does this information look correct?
     
     async def process_uploaded_images(self, files: list):
         """Process uploaded parking ticket images."""
+        preview_task: Optional[asyncio.Task] = None
         try:
             # Show processing message
             processing_msg = cl.Message(
@@ -254,30 +260,33 @@ Does this information look correct?
             )
             await processing_msg.send()
             
-            # Process the first image
+            # Process the first page of the first upload (PDFs and TIFFs are rendered lazily)
             file = files[0]
+            page = await asyncio.to_thread(first_page, file.content, file.mime)
             
-            # Save the uploaded file temporarily
-            temp_path = f"temp_{file.name}"
-            with open(temp_path, "wb") as f:
-                f.write(file.content)
+            # Build the preview in the background while OCR runs
+            if page["content"] is not None:
+                preview_task = asyncio.create_task(self.preview_service.get_preview(page["content"]))
             
-            # Extract data from image
-            extracted_data = self.image_processor.analyze_parking_ticket(temp_path)
-            
-            # Clean up temp file
-            import os
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+            # Extract data from the page text layer, or by OCR in the worker pool
+            extracted_data = await self.ocr_executor.analyze_page("parking", page)
             
             # Store extracted data
             cl.user_session.set("collected_data", extracted_data)
             self.uploaded_image_data = extracted_data
             
             # Show extracted information for confirmation
-            await self.show_extracted_data_confirmation(extracted_data)
+            preview_path = await preview_task if preview_task is not None else None
+            await self.show_extracted_data_confirmation(extracted_data, [preview_path] if preview_path else None)
+            
+        except ImageQualityError as e:
+            # Ask for a retake instead of running OCR on a hopeless photo
+            issues = "\n".join(f"- {issue}" for issue in e.issues)
+            await cl.Message(
+                content=f"📷 **I couldn't read that photo reliably.**\n\n{issues}\n\nPlease upload a new photo of your parking ticket, or type **'manual'** to enter the information step-by-step.",
+                author="AppealAI Assistant"
+            ).send()
+            cl.user_session.set("collection_step", "upload_choice")
             
         except Exception as e:
             await cl.Message(
@@ -285,8 +294,12 @@ Does this information look correct?
                 author="AppealAI Assistant"
             ).send()
             await self.start_manual_collection()
+        finally:
+            # A preview nobody will show (rejected photo or error) must not outlive the request
+            if preview_task is not None:
+                preview_task.cancel()
     
-    async def show_extracted_data_confirmation(self, extracted_data: Dict[str, Any]):
+    async def show_extracted_data_confirmation(self, extracted_data: Dict[str, Any], preview_paths: Optional[List[str]] = None):
         """Show extracted data for user confirmation."""
         confirmation_text = f"""
 ✅ **Information Extracted from Your Parking Ticket**
@@ -315,9 +328,16 @@ Here's what I found in your ticket image:
 *Note: You'll still be able to add your dispute reason and evidence in the next steps.*
         """
         
+        # Show the user what was read alongside the upload itself
+        elements = [
+            cl.Image(name=f"ticket_preview_{i + 1}", path=path, display="inline")
+            for i, path in enumerate(preview_paths or [])
+        ]
+        
         await cl.Message(
             content=confirmation_text,
-            author="AppealAI Assistant"
+            author="AppealAI Assistant",
+            elements=elements
         ).send()
         
         cl.user_session.set("collection_step", "confirm_extracted_data")
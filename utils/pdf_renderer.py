@@ -0,0 +1,60 @@
+import io
+import threading
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from templates.document_templates import HEADER, PARAGRAPH, SUBTITLE, Section, section_paragraphs
+
+PDF_MIME_TYPE = "application/pdf"
+
+_styles: Optional[Dict[str, ParagraphStyle]] = None
+_styles_lock = threading.Lock()
+
+
+def get_styles() -> Dict[str, ParagraphStyle]:
+    """Paragraph styles for each section kind, built once per process."""
+    global _styles
+    with _styles_lock:
+        if _styles is None:
+            sample = getSampleStyleSheet()
+            body = ParagraphStyle("DisputeBody", parent=sample["Normal"], fontName="Helvetica",
+                                  fontSize=11, leading=14, spaceAfter=8)
+            _styles = {
+                "title": ParagraphStyle("DisputeTitle", parent=sample["Title"], fontName="Helvetica-Bold",
+                                        fontSize=20, leading=24, alignment=TA_CENTER, spaceAfter=6),
+                SUBTITLE: ParagraphStyle("DisputeSubtitle", parent=body, fontName="Helvetica-Bold",
+                                         alignment=TA_CENTER, spaceAfter=14),
+                HEADER: ParagraphStyle("DisputeHeader", parent=body, fontName="Helvetica-Bold"),
+                PARAGRAPH: body,
+            }
+        return _styles
+
+
+def _markup(text: str) -> str:
+    """Escape text for ReportLab's paragraph markup, keeping its line breaks."""
+    return escape(text).replace("\n", "<br/>")
+
+
+def render_pdf(title: str, sections: List[Section]) -> bytes:
+    """Render a dispute document's title and sections to PDF bytes.
+
+    Laid out like the Word version: letter pages with one-inch margins, a centered
+    title and subtitle, and header blocks in bold.
+    """
+    styles = get_styles()
+    story = [Paragraph(_markup(title), styles["title"])]
+    for kind, text in section_paragraphs(sections):
+        story.append(Paragraph(_markup(text), styles[kind]))
+
+    buffer = io.BytesIO()
+    # Pages are written into the buffer as they are laid out
+    document = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=inch, rightMargin=inch,
+                                 topMargin=inch, bottomMargin=inch, title=title)
+    document.build(story)
+    return buffer.getvalue()
@@ -0,0 +1,136 @@
+import io
+import os
+import time
+import atexit
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from .image_processor import check_upload_limits
+
+
+class PreviewService:
+    """Builds small previews of uploads on a background thread, cached by content hash."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size: Tuple[int, int] = (400, 300),
+                 max_disk_bytes: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.cache_dir = cache_dir or os.getenv("APPEALAI_PREVIEW_DIR", os.path.join("cache", "previews"))
+        self.max_size = max_size
+        self.max_disk_bytes = max_disk_bytes or int(os.getenv("APPEALAI_PREVIEW_CACHE_MAX_MB", "50")) * 1024 * 1024
+        self.ttl_seconds = ttl_seconds or int(os.getenv("APPEALAI_PREVIEW_CACHE_TTL", str(24 * 3600)))
+        # Prune the cache after this many new previews rather than on every one
+        self.prune_interval = 32
+        self._writes_since_prune = 0
+        # Decoding releases the GIL, so one background thread keeps previews off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def preview_path(self, content: bytes) -> str:
+        """Where the preview for these upload bytes is stored."""
+        digest = hashlib.sha256(content).hexdigest()
+        width, height = self.max_size
+        return os.path.join(self.cache_dir, f"{digest}_{width}x{height}.jpg")
+
+    def create_preview(self, content: bytes) -> Optional[str]:
+        """Create (or reuse) the preview for an upload and return its path."""
+        path = self.preview_path(content)
+        if os.path.exists(path):
+            try:
+                # Refresh the age so previews still being shown are pruned last
+                os.utime(path)
+                return path
+            except OSError:
+                # Pruned in the meantime; build it again
+                pass
+
+        try:
+            # Never decode an upload the OCR pipeline would refuse
+            check_upload_limits(content)
+            with Image.open(io.BytesIO(content)) as img:
+                # JPEGs decode straight at a reduced scale; other formats are reduced before resampling
+                img.draft("RGB", self.max_size)
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail(self.max_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+                if img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+
+                # Write to a temporary file first so concurrent readers never see a partial preview
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                img.save(temp_path, "JPEG", quality=85, optimize=True)
+                os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error creating preview: {str(e)}")
+            return None
+
+        # Previews are only written on the background thread, so no lock is needed here
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= self.prune_interval:
+            self._writes_since_prune = 0
+            self.prune()
+        return path
+
+    def prune(self):
+        """Evict expired previews, then the oldest ones until under the size quota."""
+        now = time.time()
+        files = []
+        total_size = 0
+
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._remove_file(entry.path)
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+        # Oldest previews go first
+        files.sort()
+        for _, size, path in files:
+            if total_size <= self.max_disk_bytes:
+                break
+            self._remove_file(path)
+            total_size -= size
+
+    async def get_preview(self, content: bytes) -> Optional[str]:
+        """Create the preview on the background thread and await its path."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.create_preview, content)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the background thread."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_shared_service: Optional[PreviewService] = None
+_shared_lock = threading.Lock()
+
+
+def get_preview_service() -> PreviewService:
+    """Return the process-wide preview service."""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = PreviewService()
+            atexit.register(_shared_service.shutdown)
+        return _shared_service
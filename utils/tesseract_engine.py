@@ -0,0 +1,229 @@
+import os
+import shlex
+import threading
+import numpy as np
+from PIL import Image
+import pytesseract
+from typing import Any, Dict, List, Optional, Tuple
+
+from .timing import get_timing_registry
+
+try:
+    # Optional: binds the Tesseract C++ API so the engine stays loaded between calls
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Stage timings for this process
+_timings = get_timing_registry()
+
+
+def _parse_config(config: str) -> Tuple[Optional[int], Dict[str, str]]:
+    """Split a pytesseract-style config string into a page segmentation mode and variables."""
+    # Tokenize the same way pytesseract does so both backends see identical settings
+    tokens = shlex.split(config, posix=os.name != 'nt')
+    psm = None
+    variables = {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "--psm" and i + 1 < len(tokens):
+            psm = int(tokens[i + 1])
+            i += 2
+        elif token == "-c" and i + 1 < len(tokens) and "=" in tokens[i + 1]:
+            key, value = tokens[i + 1].split("=", 1)
+            variables[key] = value
+            i += 2
+        else:
+            # --oem and anything else only matter at engine start-up
+            i += 1
+    return psm, variables
+
+
+def _tessdata_path() -> Optional[str]:
+    """Locate tessdata next to a custom tesseract executable, if one was configured."""
+    command = pytesseract.pytesseract.tesseract_cmd
+    if os.path.isabs(command):
+        path = os.path.join(os.path.dirname(command), "tessdata")
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+class TesseractEngine:
+    """Runs Tesseract through a long-lived engine instance when tesserocr is installed.
+
+    Without tesserocr every call falls back to pytesseract, which starts a new
+    tesseract process per call.
+    """
+
+    def __init__(self, lang: str = "eng"):
+        self.lang = lang
+        self._api = None
+        self._variables: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def persistent(self) -> bool:
+        """Whether calls reuse a loaded engine instead of spawning tesseract."""
+        return tesserocr is not None
+
+    def warm_up(self):
+        """Load the engine and language data ahead of the first request."""
+        if self.persistent:
+            with self._lock:
+                self._get_api()
+
+    def _get_api(self):
+        if self._api is None:
+            kwargs: Dict[str, Any] = {"lang": self.lang}
+            path = _tessdata_path()
+            if path:
+                kwargs["path"] = path
+            self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        return self._api
+
+    def _prepare(self, image: np.ndarray, config: str):
+        """Configure the engine for this call and hand it the image."""
+        api = self._get_api()
+        psm, variables = _parse_config(config)
+        api.SetPageSegMode(psm if psm is not None else tesserocr.PSM.AUTO)
+
+        # Variables persist on the engine, so clear the ones the previous call set
+        for key in self._variables:
+            if key not in variables:
+                api.SetVariable(key, "")
+        for key, value in variables.items():
+            api.SetVariable(key, value)
+        self._variables = variables
+
+        api.SetImage(Image.fromarray(image))
+        return api
+
+    @_timings.timed("tesseract.image_to_string")
+    def image_to_string(self, image: np.ndarray, config: str = "") -> str:
+        """Recognize the text in an image."""
+        if not self.persistent:
+            return pytesseract.image_to_string(image, config=config)
+
+        with self._lock:
+            api = self._prepare(image, config)
+            try:
+                return api.GetUTF8Text()
+            finally:
+                api.Clear()
+
+    @_timings.timed("tesseract.image_to_data")
+    def image_to_data(self, image: np.ndarray, config: str = "") -> Dict[str, list]:
+        """Recognize words with their boxes and confidences, in pytesseract's DICT layout."""
+        if not self.persistent:
+            data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+            data["conf"] = [float(conf) for conf in data["conf"]]
+            return data
+
+        data: Dict[str, list] = {
+            "text": [], "left": [], "top": [], "width": [], "height": [], "conf": [],
+            "block_num": [], "par_num": [], "line_num": []
+        }
+        with self._lock:
+            api = self._prepare(image, config)
+            try:
+                api.Recognize()
+                iterator = api.GetIterator()
+                level = tesserocr.RIL.WORD
+                words = tesserocr.iterate_level(iterator, level) if iterator is not None else []
+                block_num = par_num = line_num = 0
+                for word in words:
+                    # Number blocks, paragraphs and lines the way tesseract's TSV output does
+                    if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                        block_num, par_num, line_num = block_num + 1, 0, 0
+                    if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+                        par_num, line_num = par_num + 1, 0
+                    if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                        line_num += 1
+                    try:
+                        text = word.GetUTF8Text(level)
+                    except RuntimeError:
+                        # Raised for empty results
+                        continue
+                    box = word.BoundingBox(level)
+                    if box is None:
+                        continue
+                    x1, y1, x2, y2 = box
+                    data["text"].append(text)
+                    data["left"].append(x1)
+                    data["top"].append(y1)
+                    data["width"].append(x2 - x1)
+                    data["height"].append(y2 - y1)
+                    data["conf"].append(float(word.Confidence(level)))
+                    data["block_num"].append(block_num)
+                    data["par_num"].append(par_num)
+                    data["line_num"].append(line_num)
+            finally:
+                api.Clear()
+        return data
+
+    @_timings.timed("tesseract.osd")
+    def image_to_osd(self, image: np.ndarray) -> Optional[Dict[str, float]]:
+        """Detect page orientation with Tesseract OSD.
+
+        Returns the clockwise rotation (0, 90, 180 or 270) that makes the text upright
+        and Tesseract's confidence in it, or None when too little text was found.
+        """
+        if self.persistent:
+            with self._lock:
+                api = self._prepare(image, "--psm 0")
+                try:
+                    result = api.DetectOrientationScript()
+                except RuntimeError:
+                    # The engine was started without OSD data; let the tesseract binary try
+                    result = None
+                finally:
+                    api.Clear()
+            if result:
+                return {"rotate": (360 - int(result["orient_deg"])) % 360,
+                        "confidence": float(result["orient_conf"])}
+
+        try:
+            data = pytesseract.image_to_osd(image, config="--psm 0", output_type=pytesseract.Output.DICT)
+        except pytesseract.TesseractError:
+            # Raised when the page has too few characters to judge
+            return None
+        return {"rotate": int(data["rotate"]), "confidence": float(data["orientation_conf"])}
+
+    def close(self):
+        """Release the engine."""
+        with self._lock:
+            if self._api is not None:
+                self._api.End()
+                self._api = None
+
+
+def data_to_text(data: Dict[str, list]) -> str:
+    """Rebuild line-broken text from image_to_data output."""
+    lines: List[str] = []
+    current_line = None
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        if not word:
+            continue
+        line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        if line_key != current_line:
+            lines.append(word)
+            current_line = line_key
+        else:
+            lines[-1] += " " + word
+    return "\n".join(lines)
+
+
+_engine: Optional[TesseractEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_tesseract_engine() -> TesseractEngine:
+    """Return the engine owned by the current process."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TesseractEngine()
+        return _engine
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import atexit
+import asyncio
+import bisect
+import functools
+import threading
+import multiprocessing
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Histogram bucket upper bounds in milliseconds; anything slower lands in a final open bucket
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# Returned by stage() while timing is disabled, so a disabled stage costs one attribute check
+_DISABLED_STAGE = nullcontext()
+
+
+class Histogram:
+    """Count, total, extremes and bucketed distribution of one stage's durations."""
+
+    __slots__ = ("count", "total_ms", "min_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min(BUCKET_BOUNDS_MS[i], self.max_ms) if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": dict(zip([f"<={bound}" for bound in BUCKET_BOUNDS_MS] + ["inf"], self.buckets)),
+        }
+
+
+class _Stage:
+    """Context manager that records the time spent inside it."""
+
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry: "TimingRegistry", name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class TimingRegistry:
+    """Per-process latency histograms for named pipeline stages.
+
+    Stages nest, so an outer stage such as a whole OCR cascade includes its inner ones.
+    Timing is on unless APPEALAI_TIMING=0.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = enabled if enabled is not None else os.getenv("APPEALAI_TIMING", "1") != "0"
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        # Per-thread stack of dicts collecting the stages of the current capture() block
+        self._local = threading.local()
+
+    def record(self, name: str, ms: float):
+        """Add one duration to a stage's histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(ms)
+
+        for captured in getattr(self._local, "captures", ()):
+            captured[name] = captured.get(name, 0.0) + ms
+
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as the named stage."""
+        if not self.enabled:
+            return _DISABLED_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator timing every call of a function or coroutine function as the named stage."""
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with _Stage(self, name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Stage(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def capture(self) -> Iterator[Dict[str, float]]:
+        """Collect the total time per stage recorded by this thread inside the block.
+
+        Used to ship a worker process's timings back with its result.
+        """
+        captured: Dict[str, float] = {}
+        captures: List[Dict[str, float]] = getattr(self._local, "captures", None) or []
+        self._local.captures = captures + [captured]
+        try:
+            yield captured
+        finally:
+            self._local.captures = captures
+
+    def merge(self, timings: Dict[str, float]):
+        """Record stage timings captured in another process."""
+        if not self.enabled:
+            return
+        for name, ms in timings.items():
+            self.record(name, ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every stage recorded so far."""
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def format_report(self) -> str:
+        """Human-readable table of the recorded stages."""
+        lines = [f"{'stage':<32}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, stats in self.snapshot().items():
+            lines.append(f"{name:<32}{stats['count']:>8}{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}"
+                         f"{stats['p95_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """Write the statistics to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+_registry: Optional[TimingRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_timing_registry() -> TimingRegistry:
+    """Return the process-wide timing registry.
+
+    If APPEALAI_TIMING_DUMP names a file, the statistics are written there at exit.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TimingRegistry()
+            dump_path = os.getenv("APPEALAI_TIMING_DUMP")
+            # Worker processes ship their timings back to the main process instead
+            if dump_path and multiprocessing.parent_process() is None:
+                atexit.register(_registry.dump, dump_path)
+        return _registry